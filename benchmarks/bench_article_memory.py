@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章内存占用对比：每篇一个字典（含小写匹配文本）与 __slots__ 只读 Article
+
+用法：python benchmarks/bench_article_memory.py [文章数]
+"""
+
+import os
+import sys
+import gc
+import time
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from article import Article
+
+def make_rows(count: int, rng: random.Random):
+    """生成合成条目的原始字段；来源名称与 URL 每篇重新构造，与解析器产出的独立字符串一致"""
+    base = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        source = rng.randrange(50)
+        rows.append((
+            f'https://example{source}.com/article/{i}',
+            f'第{i}篇 合成文章标题 AI 芯片 {rng.random():.6f}',
+            f'https://example{source}.com/article/{i}?from=rss',
+            base + timedelta(minutes=i),
+            '合成摘要内容 ' * rng.randint(5, 30),
+            ''.join(['来源', str(source)]),
+            ''.join(['https://example', str(source), '.com/feed'])
+        ))
+    return rows
+
+def build_dicts(rows):
+    """原来的文章字典（入库时附带小写匹配文本）"""
+    return [{
+        'id': id_, 'title': title, 'link': link, 'published': published, 'summary': summary,
+        'source': source, 'source_url': source_url, 'match_text': f"{title.lower()} {summary.lower()}"
+    } for id_, title, link, published, summary, source, source_url in rows]
+
+def build_articles(rows):
+    """Article 记录（匹配文本首次使用时计算）"""
+    articles = [Article(*row) for row in rows]
+    for article in articles:
+        article.match_text
+    return articles
+
+def measure(label, build, count):
+    """从原始字段开始构造，输出构造完成后仍被文章持有的内存（原始条目已释放）"""
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(count, random.Random(42))
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    del rows
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {current / 1024 / 1024:8.1f} MB  {current / count:6.0f} B/篇  构造 {elapsed:.2f}s")
+    return current, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"文章数 {count}")
+    dict_bytes, dicts = measure('dict', build_dicts, count)
+    del dicts
+    article_bytes, articles = measure('Article', build_articles, count)
+    print(f"内存减少 {(1 - article_bytes / dict_bytes) * 100:.0f}%")
+
+if __name__ == '__main__':
+    main()
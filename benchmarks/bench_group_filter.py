@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分组过滤性能对比：逐组逐篇的 _match_group、倒排索引的 filter_by_groups、numpy 批量模式的 filter_by_groups_batch
+
+用法：python benchmarks/bench_group_filter.py [文章数] [分组数] [每组关键词数]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from content_filter import ContentFilter
+
+VOCABULARY = [
+    'AI', '人工智能', '机器学习', 'ChatGPT', '大模型', '科技', '创新', '创业', '投资', '融资',
+    'IPO', '上市', '收购', '合并', '裁员', '芯片', '半导体', '新能源', '电动车', '元宇宙',
+    'Web3', '区块链', '华为', '鸿蒙', '手机', '苹果', '特斯拉', '英伟达', 'OpenAI', '云计算',
+    '数据中心', '机器人', '自动驾驶', '电池', '光伏', '储能', '出海', '跨境', '电商', '直播'
+]
+FILLER = '的了在是和对与中为上下来去说这那有个们到时要就出也会'
+
+def make_articles(count: int, rng: random.Random):
+    """生成带随机关键词的合成文章"""
+    sources = [f'来源{i}' for i in range(20)]
+    articles = []
+    for i in range(count):
+        words = rng.sample(VOCABULARY, 3) + [''.join(rng.choice(FILLER) for _ in range(40))]
+        rng.shuffle(words)
+        articles.append({
+            'title': ' '.join(words[:2]),
+            'summary': ' '.join(words[2:]) * 3,
+            'source': rng.choice(sources),
+            'published': datetime.now()
+        })
+    return articles
+
+def make_groups(count: int, size: int, rng: random.Random):
+    """生成随机分组（普通词 + 可选必须词/排除词）"""
+    groups = []
+    for _ in range(count):
+        words = rng.sample(VOCABULARY, size + 2)
+        groups.append({
+            'keywords': words[:size],
+            'must_keywords': [words[size]] if rng.random() < 0.3 else [],
+            'exclude_keywords': [words[size + 1]] if rng.random() < 0.3 else []
+        })
+    return groups
+
+def timed(label, func):
+    """运行并输出耗时"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed * 1000:>10.1f} ms")
+    return result
+
+def main():
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_groups = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    group_size = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    logging.disable(logging.INFO)
+    rng = random.Random(42)
+    articles = make_articles(n_articles, rng)
+    groups = make_groups(n_groups, group_size, rng)
+    content_filter = ContentFilter()
+
+    print(f"文章数 {n_articles}，分组数 {n_groups}，每组关键词 {group_size}")
+    baseline = timed('_match_group 逐组逐篇', lambda: [
+        [a for a in articles if content_filter._match_group(a, g)] for g in groups
+    ])
+    indexed = timed('filter_by_groups 倒排索引', lambda: content_filter.filter_by_groups(articles, groups))
+    batch = timed('filter_by_groups_batch numpy', lambda: content_filter.filter_by_groups_batch(articles, groups))
+
+    for expected, got_index, got_batch in zip(baseline, indexed, batch):
+        assert got_index['matched_articles'] == expected
+        assert got_batch['matched_articles'] == expected
+    print("三种方式结果一致")
+
+if __name__ == "__main__":
+    main()
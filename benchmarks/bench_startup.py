@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行冷启动耗时：分别运行 help / test / stats 子命令，统计进程总耗时的中位数
+
+用法：python benchmarks/bench_startup.py [重复次数] [--cold]
+（--cold 每次运行前删除 jieba 前缀词典缓存，模拟全新环境）
+（test 子命令指向本机不可达地址，只测量启动开销，不发送真实请求）
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT, 'src', 'main.py')
+COMMANDS = ['help', 'test', 'stats']
+JIEBA_CACHES = [
+    os.path.join(tempfile.gettempdir(), 'jieba.cache'),
+    os.path.join(ROOT, 'cache', 'jieba.cache')
+]
+
+def run_once(command: str, cold: bool = False) -> float:
+    """运行一次子命令，返回耗时（秒）"""
+    if cold:
+        for path in JIEBA_CACHES:
+            if os.path.exists(path):
+                os.remove(path)
+    env = dict(os.environ, FEISHU_WEBHOOK_URL='http://127.0.0.1:9/')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, MAIN, command], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    if b'Traceback' in result.stderr:
+        raise RuntimeError(f"{command} 运行出错:\n{result.stderr.decode('utf-8', 'replace')}")
+    return elapsed
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    cold = '--cold' in sys.argv
+    repeat = int(args[0]) if args else 5
+    # main.py 启动时即写入 logs/ 下的日志文件
+    os.makedirs(os.path.join(ROOT, 'logs'), exist_ok=True)
+    for command in COMMANDS:
+        timings = [run_once(command, cold) for _ in range(repeat)]
+        print(f"{command:<6} 中位数 {statistics.median(timings):.3f}s  最小 {min(timings):.3f}s")
+
+if __name__ == "__main__":
+    main()
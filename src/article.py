@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from datetime import datetime, tzinfo
+from typing import Any, Iterator, Mapping, Optional
+
+from text_normalize import collapse_whitespace, match_text, normalize_summary
+
+# 文章字段（match_text 为派生字段，首次读取时计算）
+ARTICLE_FIELDS = ('id', 'title', 'link', 'published', 'summary', 'source', 'source_url', 'match_text')
+# 发布时间为配置时区下不带时区信息的本地时间，计算 Unix 时间戳时按该时区解释（None 表示系统本地时区）
+_timezone: Optional[tzinfo] = None
+
+def set_timezone(tz: Optional[tzinfo]) -> None:
+    """设置发布时间所在的时区（由 RSSFetcher 按 timezone 配置调用）"""
+    global _timezone
+    _timezone = tz
+
+class Article(Mapping):
+    """单篇文章（只读）
+
+    以 __slots__ 保存字段，不再为每篇文章分配一个字典；来源名称与来源 URL 经 sys.intern 驻留，
+    同一来源的文章共用同一个字符串。小写匹配文本与时间戳在首次使用时计算并缓存。
+    实现 Mapping 接口，原来按字典读取文章的代码（article['title']、article.get('summary') 等）无需修改。
+    相等按字段比较（与同内容的字典也相等），哈希按链接计算，可放入集合或作为字典键。
+    """
+    __slots__ = ('id', 'title', 'link', 'published', 'summary', 'source', 'source_url',
+                 '_match_text', '_timestamp')
+
+    def __init__(self, id: str = '', title: str = '', link: str = '', published: datetime = None,
+                 summary: str = '', source: str = '', source_url: str = ''):
+        setattr_ = object.__setattr__
+        setattr_(self, 'id', id)
+        setattr_(self, 'title', title)
+        setattr_(self, 'link', link)
+        setattr_(self, 'published', published)
+        setattr_(self, 'summary', summary)
+        setattr_(self, 'source', sys.intern(source))
+        setattr_(self, 'source_url', sys.intern(source_url))
+        setattr_(self, '_match_text', None)
+        setattr_(self, '_timestamp', None)
+
+    @classmethod
+    def create(cls, id: str, title: str, link: str, published: datetime, summary: str,
+               source: str, source_url: str, max_chars: int = 500) -> 'Article':
+        """由解析出的原始字段创建文章：标题合并空白，摘要去掉 HTML 并截断（0 表示不截断）"""
+        return cls(id or '', collapse_whitespace(title or ''), link or '', published,
+                   normalize_summary(summary, max_chars), source, source_url)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Article 是只读对象")
+
+    def __reduce__(self):
+        return (Article, (self.id, self.title, self.link, self.published,
+                          self.summary, self.source, self.source_url))
+
+    @property
+    def match_text(self) -> str:
+        """小写的 "标题 摘要" 匹配文本"""
+        text = self._match_text
+        if text is None:
+            text = match_text(self.title, self.summary)
+            object.__setattr__(self, '_match_text', text)
+        return text
+
+    @property
+    def timestamp(self) -> int:
+        """发布时间的 Unix 时间戳（秒），无发布时间时为 0"""
+        value = self._timestamp
+        if value is None:
+            published = self.published
+            if published is None:
+                value = 0
+            else:
+                if published.tzinfo is None and _timezone is not None:
+                    published = published.replace(tzinfo=_timezone)
+                value = int(published.timestamp())
+            object.__setattr__(self, '_timestamp', value)
+        return value
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in ARTICLE_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ARTICLE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ARTICLE_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Article({self.source}: {self.title})"
+
+    def __hash__(self) -> int:
+        # Mapping 定义了 __eq__（按字段比较）而没有 __hash__；相等的文章链接必然相同，按链接哈希即可放入集合或作为字典键
+        return hash(self.link)
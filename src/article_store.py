@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+from tokenizer import tokenize
+from text_normalize import match_text
+from article import Article
+
+class ArticleStore:
+    """基于 SQLite 的本地文章库，按条目 id（无 id 时按链接）记录已见文章
+
+    index_terms 为 True 时随文章增删增量维护分词后的文档频率与语料统计，供 BM25 相关性排序使用。
+    """
+
+    def __init__(self, db_path: str = "cache/articles.db", retention_days: int = 30,
+                 index_terms: bool = True):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.index_terms = index_terms
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """数据库连接（首次使用时才创建文件和表）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._create_schema(self._conn)
+            if self.index_terms:
+                self._backfill_terms(self._conn)
+        return self._conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        """建表及索引"""
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    key TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    published TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    source_url TEXT NOT NULL,
+                    first_seen TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS term_df (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS corpus_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+
+    @staticmethod
+    def _terms(title: str, summary: str) -> Counter:
+        """文章的词频（与 TextCache 相同的小写文本与分词方式）"""
+        return Counter(tokenize(match_text(title, summary)))
+
+    def _update_terms(self, conn: sqlite3.Connection, docs: Iterable[Tuple[str, str]], sign: int) -> None:
+        """增量更新文档频率与语料统计（sign 为 1 表示新增文档，-1 表示删除文档）"""
+        doc_freq: Counter = Counter()
+        doc_count = total_length = 0
+        for title, summary in docs:
+            counts = self._terms(title, summary)
+            doc_freq.update(counts.keys())
+            doc_count += 1
+            total_length += sum(counts.values())
+        if not doc_count:
+            return
+        conn.executemany(
+            "INSERT INTO term_df VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+            ((term, sign * df) for term, df in doc_freq.items())
+        )
+        if sign < 0:
+            conn.execute("DELETE FROM term_df WHERE df <= 0")
+        conn.executemany(
+            "INSERT INTO corpus_stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (('doc_count', sign * doc_count), ('total_length', sign * total_length))
+        )
+
+    def _backfill_terms(self, conn: sqlite3.Connection) -> None:
+        """已有文章但尚无语料统计时（旧版本建立的文章库）补建一次"""
+        if conn.execute("SELECT 1 FROM corpus_stats WHERE name = 'doc_count'").fetchone():
+            return
+        rows = conn.execute("SELECT title, summary FROM articles").fetchall()
+        with conn:
+            self._update_terms(conn, rows, 1)
+            conn.execute("INSERT OR IGNORE INTO corpus_stats VALUES ('doc_count', 0)")
+        if rows:
+            self.logger.info(f"文章库补建词频统计 {len(rows)} 篇")
+
+    @staticmethod
+    def article_key(article: Dict[str, Any]) -> str:
+        """文章唯一键：优先条目 id，其次链接，都没有时使用来源与标题的哈希"""
+        key = article.get('id') or article.get('link')
+        if key:
+            return key
+        raw = f"{article.get('source', '')}|{article.get('title', '')}"
+        return 'sha1:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def add_new(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """写入文章，只返回此前未见过的文章"""
+        new_articles = []
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            for article in articles:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.article_key(article),
+                        article.get('title', ''),
+                        article.get('link', ''),
+                        article.get('summary', ''),
+                        article['published'].isoformat(),
+                        article.get('source', ''),
+                        article.get('source_url', ''),
+                        now
+                    )
+                )
+                if cursor.rowcount:
+                    new_articles.append(article)
+            if self.index_terms:
+                self._update_terms(
+                    self.conn,
+                    ((article.get('title', ''), article.get('summary', '')) for article in new_articles),
+                    1
+                )
+        self.logger.info(f"文章库新增 {len(new_articles)} 篇，跳过已见 {len(articles) - len(new_articles)} 篇")
+        return new_articles
+
+    def query(self, start: datetime, end: Optional[datetime] = None,
+              source: Optional[str] = None) -> List[Article]:
+        """按发布时间范围（及来源）查询文章，按发布时间倒序"""
+        sql = "SELECT * FROM articles WHERE published >= ?"
+        params: List[Any] = [start.isoformat()]
+        if end is not None:
+            sql += " AND published <= ?"
+            params.append(end.isoformat())
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY published DESC"
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_article(row) for row in rows]
+
+    @staticmethod
+    def _row_to_article(row: sqlite3.Row) -> Article:
+        """数据库行转换为文章（摘要入库前已规范化）"""
+        return Article(
+            row['key'], row['title'], row['link'], datetime.fromisoformat(row['published']),
+            row['summary'], row['source'], row['source_url']
+        )
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """删除超过保留天数的文章，返回删除数量"""
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        with self._lock, self.conn:
+            if self.index_terms:
+                expired = self.conn.execute(
+                    "SELECT title, summary FROM articles WHERE published < ?", (cutoff.isoformat(),)
+                ).fetchall()
+                self._update_terms(self.conn, expired, -1)
+            cursor = self.conn.execute("DELETE FROM articles WHERE published < ?", (cutoff.isoformat(),))
+        return cursor.rowcount
+
+    def corpus_stats(self) -> Tuple[int, float]:
+        """(文档数, 平均文档长度)"""
+        with self._lock:
+            stats = dict(self.conn.execute("SELECT name, value FROM corpus_stats").fetchall())
+        doc_count = stats.get('doc_count', 0)
+        return doc_count, (stats.get('total_length', 0) / doc_count if doc_count else 0.0)
+
+    def document_frequencies(self, terms: Sequence[str]) -> Dict[str, int]:
+        """查询词的文档频率（未出现的词不返回）"""
+        if not terms:
+            return {}
+        placeholders = ', '.join('?' * len(terms))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT term, df FROM term_df WHERE term IN ({placeholders})", list(terms)
+            ).fetchall()
+        return {row['term']: row['df'] for row in rows}
+
+    def count(self) -> int:
+        """文章总数"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
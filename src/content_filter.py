@@ -2,16 +2,22 @@
 # -*- coding: utf-8 -*-
 
 import re
-import jieba
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, FrozenSet, Mapping, Tuple, Union
 from datetime import datetime
-from word_group_parser import WordGroupParser
+from word_group_parser import RuleSet, compile_term
+from keyword_matcher import KeywordMatcher
+from keyword_index import KeywordIndex
+from text_cache import TextCache
+from near_duplicate import NearDuplicateIndex
+from url_index import canonicalize_url
+from relevance import BM25Ranker, query_terms
+from tokenizer import KeywordSet, tokenize
 
 class ContentFilter:
     """新闻内容筛选模块"""
     
-    def __init__(self):
+    def __init__(self, text_cache: TextCache = None):
         # 设置日志
         logging.basicConfig(
             level=logging.INFO,
@@ -19,8 +25,12 @@ class ContentFilter:
         )
         self.logger = logging.getLogger(__name__)
         
-        # 初始化 jieba
-        jieba.initialize()
+        # jieba 在首次对中文文本分词时才加载（见 jieba_loader、tokenizer），纯子串匹配和纯拉丁文本不会触发加载
+
+        # 文章小写文本与分词缓存（可与日报生成模块共享）
+        self.text_cache = text_cache if text_cache is not None else TextCache()
+        # 关键词配置 -> 预编译的关键词集合，每份配置只编译、分词一次
+        self._keyword_sets: Dict[Tuple[str, ...], KeywordSet] = {}
     
     def filter_articles(self, articles: List[Dict[str, Any]], config: Dict[str, Any]) -> List[Dict[str, Any]]:
         """根据配置筛选文章"""
@@ -35,16 +45,14 @@ class ContentFilter:
     
     def _should_include_article(self, article: Dict[str, Any], config: Dict[str, Any]) -> bool:
         """判断文章是否应该被包含"""
-        title = article.get('title', '').lower()
-        summary = article.get('summary', '').lower()
-        content = f"{title} {summary}"
+        content = self.text_cache.text(article)
         
         # 检查排除关键词
         if self._contains_exclude_keywords(content, config):
             return False
         
-        # 检查包含关键词
-        if not self._contains_include_keywords(content, config):
+        # 检查包含关键词（分词结果按需从缓存读取）
+        if not self._contains_include_keywords(content, config, lambda: self.text_cache.tokens(article)):
             return False
         
         return True
@@ -52,37 +60,41 @@ class ContentFilter:
     def _contains_exclude_keywords(self, content: str, config: Dict[str, Any]) -> bool:
         """检查是否包含排除关键词"""
         exclude_keywords = config.get('exclude_keywords', [])
+        if not exclude_keywords:
+            return False
         
-        for keyword in exclude_keywords:
-            if keyword.lower() in content:
-                self.logger.debug(f"文章包含排除关键词: {keyword}")
-                return True
+        keyword = self._compile_keywords(exclude_keywords).find(content)
+        if keyword is not None:
+            self.logger.debug(f"文章包含排除关键词: {keyword}")
+            return True
         
         return False
     
-    def _contains_include_keywords(self, content: str, config: Dict[str, Any]) -> bool:
+    def _contains_include_keywords(self, content: str, config: Dict[str, Any],
+                                   content_tokens: Callable[[], FrozenSet[str]] = None) -> bool:
         """检查是否包含包含关键词"""
         include_keywords = config.get('keywords', [])
         
         if not include_keywords:
             return True  # 如果没有设置关键词，则包含所有文章
         
-        # 使用 jieba 分词进行更精确的匹配
-        content_words = set(jieba.lcut(content))
+        keyword_set = self._compile_keywords(include_keywords)
         
-        for keyword in include_keywords:
-            keyword_lower = keyword.lower()
-            
-            # 直接字符串匹配
-            if keyword_lower in content:
-                return True
-            
-            # 分词匹配
-            keyword_words = set(jieba.lcut(keyword_lower))
-            if keyword_words.intersection(content_words):
-                return True
+        # 直接匹配（拉丁文字关键词按单词边界，中文关键词按子串）
+        if keyword_set.find(content) is not None:
+            return True
         
-        return False
+        # 分词匹配（只有直接匹配落空时才需要分词；纯拉丁文本用正则切分，中文文本用 jieba）
+        content_words = content_tokens() if content_tokens else frozenset(tokenize(content))
+        return not keyword_set.tokens.isdisjoint(content_words)
+    
+    def _compile_keywords(self, keywords: List[str]) -> KeywordSet:
+        """编译关键词集合，结果按关键词配置缓存"""
+        key = tuple(keywords)
+        keyword_set = self._keyword_sets.get(key)
+        if keyword_set is None:
+            keyword_set = self._keyword_sets[key] = KeywordSet(keywords)
+        return keyword_set
     
     def filter_by_source(self, articles: List[Dict[str, Any]], source_name: str = None) -> List[Dict[str, Any]]:
         """按来源筛选文章"""
@@ -110,15 +122,19 @@ class ContentFilter:
         self.logger.info(f"按日期范围筛选后保留 {len(filtered)} 篇文章")
         return filtered
     
-    def remove_duplicates(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去除重复文章（基于标题和链接）"""
+    def remove_duplicates(self, articles: List[Dict[str, Any]], near_duplicates: bool = False) -> List[Dict[str, Any]]:
+        """去除重复文章（基于标题和规范化链接）；near_duplicates 为 True 时再合并近似重复的报道，每篇只保留首次出现的一条"""
+        total = len(articles)
+        if near_duplicates:
+            articles = [articles[members[0]] for members in NearDuplicateIndex().cluster(articles)]
+        
         seen_titles = set()
         seen_links = set()
         unique_articles = []
         
         for article in articles:
             title = article.get('title', '').strip()
-            link = article.get('link', '').strip()
+            link = canonicalize_url(article.get('link', ''))
             
             # 检查标题和链接是否重复
             if title not in seen_titles and link not in seen_links:
@@ -126,7 +142,7 @@ class ContentFilter:
                 seen_links.add(link)
                 unique_articles.append(article)
         
-        removed_count = len(articles) - len(unique_articles)
+        removed_count = total - len(unique_articles)
         self.logger.info(f"去除 {removed_count} 篇重复文章，保留 {len(unique_articles)} 篇")
         
         return unique_articles
@@ -137,14 +153,14 @@ class ContentFilter:
         if not priority_keywords:
             return articles
         
+        keywords_lower = [keyword.lower() for keyword in priority_keywords]
+        
         def get_priority_score(article):
-            title = article.get('title', '').lower()
-            summary = article.get('summary', '').lower()
-            content = f"{title} {summary}"
+            content = self.text_cache.text(article)
             
             score = 0
-            for keyword in priority_keywords:
-                if keyword.lower() in content:
+            for keyword in keywords_lower:
+                if keyword in content:
                     score += 1
             
             return score
@@ -153,8 +169,24 @@ class ContentFilter:
         self.logger.info(f"按优先级关键词排序完成")
         
         return sorted_articles
+    
+    def rank_by_relevance(self, articles: List[Dict[str, Any]], keywords: List[str],
+                          top_k: int = None, ranker: BM25Ranker = None) -> List[Dict[str, Any]]:
+        """按与关键词的 BM25 相关性排序；指定 top_k 时只取前 top_k 篇（堆选择，不做全量排序）
+
+        ranker 通常由文章库的增量统计构建（BM25Ranker.from_store），未指定时由传入的文章临时统计。
+        """
+        if ranker is None:
+            ranker = self.build_ranker(articles)
+        ranked = ranker.top_k(articles, query_terms(keywords), self.text_cache.term_counts, top_k)
+        return [article for _, article in ranked]
+    
+    def build_ranker(self, articles: List[Dict[str, Any]]) -> BM25Ranker:
+        """由文章窗口临时统计语料，构建 BM25 评分器（没有文章库时使用）"""
+        return BM25Ranker.from_documents(self.text_cache.term_counts(article) for article in articles)
 
-    def filter_by_groups(self, articles: List[Dict[str, Any]], groups: List[Dict[str, List[str]]]) -> List[Dict]:
+    def filter_by_groups(self, articles: List[Dict[str, Any]], groups: Union[RuleSet, List[Dict[str, List[str]]]],
+                         ranker: BM25Ranker = None, top_k: int = None) -> List[Dict]:
         """
         按分组过滤并统计文章。
         返回每个分组的命中文章列表和分组配置。
@@ -162,33 +194,111 @@ class ContentFilter:
             'group': group_config,
             'matched_articles': [...]
         }, ...]
+        groups 可以是 WordGroupParser.compile() 的规则集（'group' 为只读的 GroupRule），
+        也可以是分组 dict 列表（临时编译）。
+        所有分组的关键词编译为一个规则集，扫描一遍文章建立倒排索引，
+        各分组再通过位图的交、并、差运算求出命中文章。
+        指定 ranker 时，组内文章按与分组关键词的 BM25 相关性从高到低排列，并增加对应的 'scores'；
+        同时指定 top_k 时每组只保留前 top_k 篇（堆选择，不做全量排序）。
+        'count' 为分组的命中文章总数（不受 top_k 影响）。
+        """
+        rules = self.compile_groups(groups)
+        index = self.build_index(articles, rules)
+        results = []
+        for rule in rules.groups:
+            bitmap = index.evaluate(rule.must, rule.exclude, rule.any_of)
+            matched = [articles[doc_id] for doc_id in index.doc_ids(bitmap)]
+            result = {'group': rule, 'matched_articles': matched, 'count': len(matched)}
+            if ranker is not None:
+                ranked = ranker.top_k(matched, query_terms(rules.query_keywords(rule)),
+                                      self.text_cache.term_counts, top_k)
+                result['matched_articles'] = [article for _, article in ranked]
+                result['scores'] = [score for score, _ in ranked]
+            results.append(result)
+        return results
+
+    def build_index(self, articles: List[Dict[str, Any]], matcher: Union[RuleSet, KeywordMatcher]) -> KeywordIndex:
+        """对文章窗口建立关键词倒排索引（文章编号即列表下标）"""
+        texts = (self.text_cache.text(article) for article in articles)
+        return KeywordIndex(matcher, texts)
+
+    def filter_by_groups_batch(self, articles: List[Dict[str, Any]], groups: Union[RuleSet, List[Dict[str, List[str]]]]) -> List[Dict]:
         """
+        批量模式（需要 numpy，适合大规模回填）：构建 文章×关键词 的布尔命中矩阵，
+        所有分组通过矩阵运算一次求值，并同时给出每组命中数和按来源的分布。
+        返回结构在 filter_by_groups 的基础上增加 'source_counts'。
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("批量模式需要 numpy，请先安装: pip install numpy")
+
+        rules = self.compile_groups(groups)
+        n_articles, n_keywords = len(articles), len(rules.keywords)
+
+        # 文章×关键词 命中矩阵（float32 以便矩阵乘法走 BLAS，计数在 2^24 以内精确）
+        hits = np.zeros((n_articles, n_keywords), dtype=np.float32)
+        for row, article in enumerate(articles):
+            keyword_ids = list(rules.find(self.text_cache.text(article)))
+            if keyword_ids:
+                hits[row, keyword_ids] = 1
+
+        # 关键词×分组 的必须词、排除词、普通词矩阵
+        must, exclude, normal = (np.zeros((n_keywords, len(rules)), dtype=np.float32) for _ in range(3))
+        for col, rule in enumerate(rules.groups):
+            must[list(rule.must), col] = 1
+            exclude[list(rule.exclude), col] = 1
+            normal[list(rule.any_of), col] = 1
+
+        # all()：命中的必须词数等于必须词总数；none()：排除词命中数为 0；any()：普通词至少命中一个
+        matched = (hits @ must) == must.sum(axis=0)
+        matched &= (hits @ exclude) == 0
+        matched &= ((hits @ normal) > 0) | (normal.sum(axis=0) == 0)
+
+        # 按来源统计：来源独热矩阵与命中矩阵相乘
+        sources, source_codes = np.unique(
+            np.array([article.get('source', '') for article in articles], dtype=object).astype(str),
+            return_inverse=True
+        )
+        source_matrix = np.zeros((n_articles, len(sources)), dtype=np.float32)
+        source_matrix[np.arange(n_articles), source_codes] = 1
+        counts = matched.sum(axis=0)
+        source_counts = matched.T.astype(np.float32) @ source_matrix
+
         results = []
-        for group in groups:
-            matched = []
-            for article in articles:
-                if self._match_group(article, group):
-                    matched.append(article)
-            results.append({'group': group, 'matched_articles': matched})
+        for col, rule in enumerate(rules.groups):
+            rows = np.flatnonzero(matched[:, col])
+            results.append({
+                'group': rule,
+                'matched_articles': [articles[row] for row in rows],
+                'count': int(counts[col]),
+                'source_counts': {
+                    str(sources[i]): int(n) for i, n in enumerate(source_counts[col]) if n
+                }
+            })
         return results
 
-    def _match_group(self, article: Dict[str, Any], group: Dict[str, List[str]]) -> bool:
+    def compile_groups(self, groups: Union[RuleSet, List[Dict[str, List[str]]]]) -> RuleSet:
+        """将分组编译为规则集（已是规则集时直接返回）"""
+        if isinstance(groups, RuleSet):
+            return groups
+        return RuleSet(groups)
+
+    def _match_group(self, article: Dict[str, Any], group: Mapping[str, List[str]]) -> bool:
         """判断文章是否命中分组"""
-        title = article.get('title', '').lower()
-        summary = article.get('summary', '').lower()
-        content = f"{title} {summary}"
+        content = self.text_cache.text(article)
         # 1. 必须全部包含 must_keywords
         for must_kw in group.get('must_keywords', []):
-            if must_kw.lower() not in content:
+            if not compile_term(must_kw)(content):
                 return False
         # 2. 不能包含 exclude_keywords
         for ex_kw in group.get('exclude_keywords', []):
-            if ex_kw.lower() in content:
+            if compile_term(ex_kw)(content):
                 return False
         # 3. 至少包含一个普通关键词
         if group.get('keywords'):
             for kw in group['keywords']:
-                if kw.lower() in content:
+                if compile_term(kw)(content):
                     return True
             return False
         # 如果没有普通关键词，只要 must_keywords 满足即可
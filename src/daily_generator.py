@@ -6,18 +6,26 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any
 from collections import defaultdict
-from word_group_parser import WordGroupParser
+from word_group_parser import WordGroupParser, RuleSet
+from text_cache import TextCache
+from near_duplicate import NearDuplicateIndex
 
 class DailyGenerator:
     """日报生成模块"""
     
-    def __init__(self):
+    def __init__(self, text_cache: TextCache = None, rules: RuleSet = None):
         # 设置日志
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger(__name__)
+        # 文章小写文本缓存（可与筛选模块共享）
+        self.text_cache = text_cache if text_cache is not None else TextCache()
+        # 近似重复报道聚类
+        self.near_duplicates = NearDuplicateIndex()
+        # 热门关键词统计使用的分组规则集（编译后的 RuleSet）
+        self.rules = rules
     
     def generate_daily_report(self, articles: List[Dict[str, Any]], 
                             max_items: int = 50) -> Dict[str, Any]:
@@ -116,27 +124,27 @@ class DailyGenerator:
         return dict(grouped)
     
     def _analyze_keywords(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
-        """分析关键词频率"""
-        keyword_count = defaultdict(int)
-        
-        # 常见科技关键词
-        tech_keywords = [
-            'AI', '人工智能', '机器学习', 'ChatGPT', '大模型', '科技', '创新',
-            '创业', '投资', '融资', 'IPO', '上市', '收购', '合并', '裁员',
-            '芯片', '半导体', '新能源', '电动车', '元宇宙', 'Web3', '区块链'
-        ]
-        
+        """分析关键词频率（关键词取自分组配置，每篇文章扫描一次）"""
+        rules = self._keyword_rules()
+        if rules is None:
+            return {}
+        term_count = defaultdict(int)
         for article in articles:
-            title = article['title'].lower()
-            summary = article.get('summary', '').lower()
-            content = f"{title} {summary}"
-            
-            for keyword in tech_keywords:
-                if keyword.lower() in content:
-                    keyword_count[keyword] += 1
-        
+            for term_id in rules.find(self.text_cache.text(article)):
+                term_count[term_id] += 1
+        keyword_count = {rules.entry(term_id): count for term_id, count in term_count.items()}
         return dict(sorted(keyword_count.items(), key=lambda x: x[1], reverse=True))
     
+    def _keyword_rules(self):
+        """统计用的分组规则集：未指定时读取默认的 frequency_words.txt，文件不存在时不统计"""
+        if self.rules is None:
+            try:
+                self.rules = WordGroupParser().compile()
+            except FileNotFoundError:
+                self.logger.info("未找到分组配置 frequency_words.txt，跳过热门关键词统计")
+                return None
+        return self.rules
+    
     def _truncate_summary(self, summary: str, max_length: int) -> str:
         """截断摘要"""
         if len(summary) <= max_length:
@@ -211,43 +219,45 @@ class DailyGenerator:
     def generate_trendar_style_report(self, group_results: list) -> str:
         """
         生成 TrendRadar 风格的分组统计文本。
-        group_results: ContentFilter.filter_by_groups 的输出
+        group_results: ContentFilter.filter_by_groups 的输出（'group' 为 GroupRule 或分组 dict；
+        带有 'scores' 时组内报道按相关性得分排序；带有 'count' 时标题中的条数取该值，即截取前的命中总数）
         """
         lines = []
         for idx, group_result in enumerate(group_results, 1):
             group = group_result['group']
             articles = group_result['matched_articles']
-            # 组描述
-            desc = []
-            desc += group.get('keywords', [])
-            desc += [f"+{w}" for w in group.get('must_keywords', [])]
-            desc += [f"!{w}" for w in group.get('exclude_keywords', [])]
-            desc_str = '、'.join(desc)
-            lines.append(f"🔥 {desc_str} : {len(articles)} 条\n")
-            # 组内文章统计
-            # 按来源+标题去重+统计出现次数
-            stat_map = {}
-            for art in articles:
-                key = (art.get('source', ''), art.get('title', ''))
-                if key not in stat_map:
-                    stat_map[key] = {
-                        'article': art,
-                        'count': 1,
-                        'first_time': art.get('published'),
-                        'last_time': art.get('published')
-                    }
-                else:
-                    stat_map[key]['count'] += 1
-                    # 更新时间范围
-                    if art.get('published') < stat_map[key]['first_time']:
-                        stat_map[key]['first_time'] = art.get('published')
-                    if art.get('published') > stat_map[key]['last_time']:
-                        stat_map[key]['last_time'] = art.get('published')
-            # 排序：出现次数多、时间新优先
-            stat_list = sorted(stat_map.values(), key=lambda x: (-x['count'], x['first_time']))
+            # 组描述（编译后的 GroupRule 已预先生成）
+            desc_str = getattr(group, 'label', None)
+            if desc_str is None:
+                desc = []
+                desc += group.get('keywords', [])
+                desc += [f"+{w}" for w in group.get('must_keywords', [])]
+                desc += [f"!{w}" for w in group.get('exclude_keywords', [])]
+                desc_str = '、'.join(desc)
+            lines.append(f"🔥 {desc_str} : {group_result.get('count', len(articles))} 条\n")
+            # 组内文章统计：近似重复的文章（同一报道在不同来源的转载、标题略有改动）合并为一条
+            scores = group_result.get('scores')
+            stat_list = []
+            for members in self.near_duplicates.cluster(articles):
+                cluster = [articles[i] for i in members]
+                times = [art.get('published') for art in cluster if art.get('published')]
+                sources = list(dict.fromkeys(art.get('source', '') for art in cluster))
+                stat_list.append({
+                    # 代表条目：最早发布的一条
+                    'article': min(cluster, key=lambda art: art.get('published') or datetime.max),
+                    'count': len(cluster),
+                    'sources': sources,
+                    'first_time': min(times) if times else None,
+                    'last_time': max(times) if times else None,
+                    'score': max(scores[i] for i in members) if scores else 0.0
+                })
+            # 排序：有相关性得分时按得分，其次出现次数多、时间新优先
+            stat_list.sort(key=lambda x: (-x['score'], -x['count'], x['first_time'] or datetime.max))
             for i, stat in enumerate(stat_list, 1):
                 art = stat['article']
                 src = art.get('source', '')
+                if len(stat['sources']) > 1:
+                    src = f"{src} 等{len(stat['sources'])}个来源"
                 title = art.get('title', '')
                 # 时间格式
                 ft = stat['first_time'].strftime('%H:%M') if stat['first_time'] else ''
@@ -258,6 +268,24 @@ class DailyGenerator:
             lines.append("")
         return '\n'.join(lines)
 
+    def format_keyword_spikes(self, spikes: List[Dict[str, Any]], window_hours: int = 24) -> str:
+        """生成关键词突增说明文本（KeywordTrends.spikes 的输出）"""
+        if not spikes:
+            return ""
+        lines = [f"📈 关键词异动（最近 {window_hours} 小时）："]
+        for spike in spikes:
+            lines.append(f"  - {spike['keyword']}：{spike['count']} 篇，约为平时的 {spike['ratio']:g} 倍")
+        return '\n'.join(lines)
+    
+    def format_missing_sources(self, skipped_sources: List[Dict[str, str]]) -> str:
+        """生成未获取到的源的说明文本"""
+        if not skipped_sources:
+            return ""
+        lines = [f"⚠️ 以下 {len(skipped_sources)} 个源本次未获取到，报告基于部分数据："]
+        for source in skipped_sources:
+            lines.append(f"  - {source.get('name', '')}（{source.get('reason', '')}）")
+        return '\n'.join(lines)
+
 if __name__ == "__main__":
     # 测试代码
     generator = DailyGenerator()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import feedparser
+from dateutil import parser as date_parser
+from lxml import etree
+
+# RSS 2.0 / RSS 1.0 (RDF) 的 item 与 Atom 的 entry
+ITEM_TAGS = ('{*}item', '{*}entry')
+
+class MalformedFeedError(ValueError):
+    """源文档不是格式良好的 XML（lxml 的修复解析会损坏实体、未转义的 & 等内容）"""
+
+class ParsedEntry(NamedTuple):
+    """feedparser 条目的精简结果，可在进程间传递"""
+    id: str
+    title: Optional[str]
+    link: Optional[str]
+    summary: str
+    published: Optional[Tuple[int, ...]]  # UTC (年, 月, 日, 时, 分, 秒)
+
+def parse_feed_entries(body: bytes) -> Tuple[Optional[str], List[ParsedEntry]]:
+    """用 feedparser 解析源文档，返回 (解析警告, 条目列表)
+
+    只返回后续需要的字段，既可在当前进程调用，也可提交到进程池执行。
+    缺少标题或链接的条目保留为 None 字段，由调用方跳过，保证与原文档条目一一对应。
+    """
+    feed = feedparser.parse(body)
+    warning = str(feed.bozo_exception) if feed.bozo else None
+    entries = []
+    for entry in feed.entries:
+        parsed_time = entry.get('published_parsed') or entry.get('updated_parsed')
+        entries.append(ParsedEntry(
+            id=entry.get('id', ''),
+            title=entry.get('title'),
+            link=entry.get('link'),
+            summary=entry.get('summary', ''),
+            published=tuple(parsed_time[:6]) if parsed_time else None
+        ))
+    return warning, entries
+
+def entry_hash(element: Any) -> str:
+    """条目哈希（不含尾部空白，保证整树解析与流式解析结果一致）"""
+    return hashlib.sha1(etree.tostring(element, with_tail=False)).hexdigest()
+
+def iter_feed_items(body: bytes) -> Iterator[Tuple[str, Any]]:
+    """流式遍历源文档中的条目，产出 (条目哈希, 条目节点)
+
+    节点只在本次迭代内有效，处理完后即被清理，峰值内存与单个条目大小相当。
+    调用方停止迭代后剩余文档不会再被解析。解析器一旦报告错误（修复解析会丢掉未定义的实体、
+    截断含裸 & 的链接）即抛出 MalformedFeedError，由调用方改用 feedparser 解析原始文档。
+    """
+    context = etree.iterparse(
+        io.BytesIO(body.strip()),
+        events=('end',),
+        tag=ITEM_TAGS,
+        recover=True,
+        resolve_entities=False,
+        no_network=True,
+        huge_tree=True
+    )
+    for _, element in context:
+        if len(context.error_log):
+            raise MalformedFeedError(str(context.error_log.last_error))
+        yield entry_hash(element), element
+        # 释放已处理的条目及其之前的兄弟节点
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+def _local_name(element: Any) -> str:
+    """去掉命名空间的标签名"""
+    return etree.QName(element).localname
+
+def _inner_text(element: Any) -> str:
+    """取节点内容：有子节点时（如 Atom xhtml）保留内部标记，否则取文本"""
+    if len(element):
+        parts = [element.text or '']
+        parts += [etree.tostring(child, encoding='unicode') for child in element]
+        return ''.join(parts).strip()
+    return (element.text or '').strip()
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """解析 RFC 822 或 ISO 8601 日期，统一转换为不带时区的 UTC 时间（与 feedparser 一致）"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def element_published(element: Any) -> Optional[datetime]:
+    """只提取条目的发布时间（UTC），用于在解析正文前判断是否在时间窗口内"""
+    updated = None
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child)
+        if name in ('pubDate', 'published', 'date'):
+            return parse_date(child.text)
+        if name == 'updated' and updated is None:
+            updated = parse_date(child.text)
+    return updated
+
+def element_to_entry(element: Any) -> Dict[str, Any]:
+    """从条目节点提取标题、链接、摘要、发布时间"""
+    fields: Dict[str, str] = {}
+    link = ''
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child)
+        if name == 'link':
+            # Atom 使用 href 属性，优先 rel=alternate
+            href = child.get('href')
+            if href:
+                if not link or child.get('rel', 'alternate') == 'alternate':
+                    link = href
+            elif not link:
+                link = (child.text or '').strip()
+        elif name not in fields:
+            fields[name] = _inner_text(child)
+
+    summary = fields.get('description') or fields.get('summary') or fields.get('content') \
+        or fields.get('encoded', '')
+    published = parse_date(fields.get('pubDate') or fields.get('published') or fields.get('date')) \
+        or parse_date(fields.get('updated'))
+    return {
+        'id': fields.get('guid') or fields.get('id', ''),
+        'title': fields.get('title', ''),
+        'link': link or fields.get('guid', ''),
+        'summary': summary,
+        'published': published
+    }
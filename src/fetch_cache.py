@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from article import Article
+
+def read_json_file(path: str, logger: logging.Logger) -> Dict[str, Any]:
+    """读取 JSON 缓存文件，文件不存在或损坏时返回空字典"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        logger.warning(f"加载缓存文件失败，将重新建立 {path}: {e}")
+        return {}
+
+def write_json_file(path: str, data: Dict[str, Any], logger: logging.Logger) -> None:
+    """原子写入 JSON 缓存文件"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, path)
+    except Exception as e:
+        logger.error(f"保存缓存文件失败 {path}: {e}")
+
+class ValidatorCache:
+    """HTTP 条件请求缓存，按源 URL 保存 ETag / Last-Modified，并在多次运行之间持久化"""
+
+    def __init__(self, cache_file: str = "cache/http_cache.json"):
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: Dict[str, Dict[str, str]] = read_json_file(cache_file, self.logger)
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """生成条件请求头"""
+        with self._lock:
+            entry = self._entries.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url: str, response_headers: Any) -> None:
+        """记录一次完整响应（缓存未命中），保存新的验证器"""
+        entry = {}
+        for header, key in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            value = response_headers.get(header)
+            if isinstance(value, str) and value:
+                entry[key] = value
+        with self._lock:
+            self.misses += 1
+            if entry:
+                if self._entries.get(url) != entry:
+                    self._entries[url] = entry
+                    self._dirty = True
+            elif self._entries.pop(url, None) is not None:
+                self._dirty = True
+
+    def record_hit(self, url: str) -> None:
+        """记录一次 304 命中"""
+        with self._lock:
+            self.hits += 1
+
+    def stats(self) -> Dict[str, int]:
+        """命中与未命中计数"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def save(self) -> None:
+        """写回缓存文件（仅在有变化时）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+        write_json_file(self.cache_file, data, self.logger)
+
+class FeedBodyCache:
+    """响应内容哈希缓存：保存上次的正文哈希与逐条目哈希对应的解析结果"""
+
+    def __init__(self, cache_file: str = "cache/feed_cache.json"):
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
+        self.body_hits = 0
+        self.reused_entries = 0
+        self.parsed_entries = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._feeds: Dict[str, Dict[str, Any]] = read_json_file(cache_file, self.logger)
+
+    @staticmethod
+    def _encode(article: Dict[str, Any]) -> Dict[str, Any]:
+        """序列化文章（来源字段由源配置重建，不重复保存）"""
+        published = article.get('published')
+        return {
+            'id': article.get('id', ''),
+            'title': article.get('title', ''),
+            'link': article.get('link', ''),
+            'published': published.isoformat() if isinstance(published, datetime) else published,
+            'summary': article.get('summary', '')
+        }
+
+    @staticmethod
+    def published_of(record: Dict[str, Any]) -> Optional[datetime]:
+        """缓存记录中的发布时间"""
+        published = record.get('published')
+        return datetime.fromisoformat(published) if published else None
+
+    @staticmethod
+    def _decode(data: Dict[str, Any], source: Dict[str, Any]) -> Article:
+        """反序列化文章（保存的标题与摘要已在解析时规范化，直接重建）"""
+        return Article(
+            data.get('id', ''), data.get('title', ''), data.get('link', ''),
+            FeedBodyCache.published_of(data) or datetime.now(), data.get('summary', ''),
+            source['name'], source['url']
+        )
+
+    def body_hash(self, url: str) -> Optional[str]:
+        """上次保存的正文哈希"""
+        with self._lock:
+            return self._feeds.get(url, {}).get('body_hash')
+
+    def known_entries(self, url: str) -> Dict[str, Dict[str, Any]]:
+        """上次保存的 条目哈希 -> 序列化文章 映射"""
+        with self._lock:
+            return dict(self._feeds.get(url, {}).get('entries', {}))
+
+    def cached_articles(self, url: str, source: Dict[str, Any]) -> List[Article]:
+        """正文未变化时直接复用上次的解析结果"""
+        with self._lock:
+            feed = self._feeds.get(url, {})
+            entries = feed.get('entries', {})
+            records = [entries[h] for h in feed.get('order', []) if h in entries]
+            self.body_hits += 1
+            self.reused_entries += len(records)
+        return [self._decode(record, source) for record in records]
+
+    def materialize(self, record: Dict[str, Any], source: Dict[str, Any]) -> Article:
+        """由已知条目哈希的缓存记录生成文章"""
+        with self._lock:
+            self.reused_entries += 1
+        return self._decode(record, source)
+
+    def store(self, url: str, body_hash: str, entries: List[Tuple[str, Dict[str, Any]]], parsed: int) -> None:
+        """保存本次正文哈希及其条目（仅保留当前正文中的条目）"""
+        encoded = {entry_hash: self._encode(article) for entry_hash, article in entries}
+        with self._lock:
+            self.parsed_entries += parsed
+            self._feeds[url] = {
+                'body_hash': body_hash,
+                'order': [entry_hash for entry_hash, _ in entries],
+                'entries': encoded
+            }
+            self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        """正文命中、复用条目与重新解析条目计数"""
+        with self._lock:
+            return {
+                'body_hits': self.body_hits,
+                'reused_entries': self.reused_entries,
+                'parsed_entries': self.parsed_entries
+            }
+
+    def save(self) -> None:
+        """写回缓存文件（仅在有变化时）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._feeds)
+            self._dirty = False
+        write_json_file(self.cache_file, data, self.logger)
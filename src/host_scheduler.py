@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class _TokenBucket:
+    """单个主机的令牌桶"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """尝试取出一个令牌，返回还需等待的秒数（0 表示已取得）"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.rate <= 0:
+            return 0.0
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class HostScheduler:
+    """按主机限速的请求调度器，仅对同一主机的请求进行延迟"""
+
+    def __init__(self, rate: float = 0.5, burst: float = 1, clock=time.monotonic, sleep=time.sleep):
+        self.default_rate = rate
+        self.default_burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _TokenBucket] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """提取 URL 的主机名"""
+        return urlparse(url).netloc.lower()
+
+    def _get_bucket(self, host: str, rate: Optional[float], burst: Optional[float]) -> _TokenBucket:
+        """获取主机的令牌桶，同一主机取各源配置中最严格的速率"""
+        rate = self.default_rate if rate is None else float(rate)
+        burst = self.default_burst if burst is None else float(burst)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = _TokenBucket(rate, burst, self._clock())
+            self._buckets[host] = bucket
+        elif rate > 0 and (bucket.rate <= 0 or rate < bucket.rate):
+            bucket.rate = rate
+            bucket.capacity = min(bucket.capacity, max(1.0, burst))
+            bucket.tokens = min(bucket.tokens, bucket.capacity)
+        return bucket
+
+    def acquire(self, url: str, rate: Optional[float] = None, burst: Optional[float] = None) -> float:
+        """等待直到可以向该主机发起请求，返回实际等待的秒数"""
+        host = self.host_of(url)
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._get_bucket(host, rate, burst)
+                wait = bucket.reserve(self._clock())
+            if wait <= 0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def penalize(self, url: str, seconds: float) -> None:
+        """暂停该主机的请求（用于 429 / Retry-After）"""
+        host = self.host_of(url)
+        with self._lock:
+            # 已有令牌桶保持其速率（可能来自源级 rate_limit），只有尚无令牌桶时才按默认值创建
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._get_bucket(host, None, None)
+            bucket.blocked_until = max(bucket.blocked_until, self._clock() + max(0.0, seconds))
+            bucket.tokens = 0.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头，支持秒数和 HTTP 日期两种格式"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import glob
+import logging
+import tempfile
+import threading
+from typing import Dict, Iterable, List
+
+# jieba 前缀词典缓存目录（默认为项目根目录下的 cache/，与抓取缓存同目录，CI 中随 actions/cache 一起恢复；
+# 按项目根目录而不是当前工作目录解析，从 src/ 运行脚本时也不会另建缓存目录）
+_cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+_jieba = None
+_lock = threading.Lock()
+# 已登记的用户词典：缓存键 -> 词语列表；已加载进 jieba 的缓存键
+_user_words: Dict[str, List[str]] = {}
+_applied_keys = set()
+
+# jieba 会作为一个整体切分的字符块（与 jieba.re_han_default 一致），且至少含一个汉字
+_USER_WORD_RE = re.compile('[\u4e00-\u9fd5a-z0-9+#&._%\\-]*[\u4e00-\u9fd5][\u4e00-\u9fd5a-z0-9+#&._%\\-]*')
+
+logger = logging.getLogger(__name__)
+
+def set_cache_dir(cache_dir: str) -> None:
+    """设置 jieba 前缀词典缓存目录（需在首次分词之前调用）"""
+    global _cache_dir
+    _cache_dir = cache_dir
+
+def is_loaded() -> bool:
+    """jieba 是否已加载"""
+    return _jieba is not None
+
+def get_jieba():
+    """首次调用时才导入并初始化 jieba（导入约 0.2 秒，加载词典约 1 秒以上）"""
+    global _jieba
+    if _jieba is None:
+        with _lock:
+            if _jieba is None:
+                import jieba
+                try:
+                    os.makedirs(_cache_dir, exist_ok=True)
+                    jieba.dt.tmp_dir = _cache_dir
+                except OSError as e:
+                    logger.warning(f"无法创建 jieba 缓存目录 {_cache_dir}，使用系统临时目录: {e}")
+                jieba.initialize()
+                for key in list(_user_words):
+                    _apply_user_dict(jieba, key)
+                _jieba = jieba
+    return _jieba
+
+def register_keywords(keywords: Iterable[str], key: str) -> None:
+    """将关键词登记为 jieba 用户词典，使每个中文关键词切分为单个词
+
+    key 通常是关键词文件内容的哈希；词典（含 jieba 建议的词频）按 key 写入缓存目录，
+    文件未变化时直接复用。jieba 尚未加载时推迟到首次分词时再生效。
+    """
+    words = sorted({keyword.lower() for keyword in keywords if _USER_WORD_RE.fullmatch(keyword.lower())})
+    with _lock:
+        _user_words[key] = words
+        if _jieba is not None:
+            _apply_user_dict(_jieba, key)
+
+def user_dict_path(key: str) -> str:
+    """用户词典缓存文件路径"""
+    return os.path.join(_cache_dir, f"jieba_userdict_{key}.txt")
+
+def _apply_user_dict(jieba, key: str) -> None:
+    """加载用户词典（缓存文件不存在时先生成）"""
+    if key in _applied_keys:
+        return
+    path = user_dict_path(key)
+    if os.path.exists(path):
+        jieba.load_userdict(path)
+    else:
+        lines = []
+        for word in _user_words[key]:
+            # 词频取 jieba 建议的最小值，保证整体切分且尽量不影响周围文本的切分
+            freq = jieba.suggest_freq(word, False)
+            jieba.add_word(word, freq)
+            lines.append(f"{word} {freq}\n")
+        _write_user_dict(path, lines)
+    _applied_keys.add(key)
+    logger.info(f"已加载 jieba 用户词典 {len(_user_words[key])} 个词")
+
+def _write_user_dict(path: str, lines: List[str]) -> None:
+    """原子写入用户词典，并清理旧关键词文件对应的词典"""
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        for stale in glob.glob(os.path.join(os.path.dirname(path), 'jieba_userdict_*.txt')):
+            os.remove(stale)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"写入 jieba 用户词典缓存失败 {path}: {e}")
+
+def lcut(text: str) -> List[str]:
+    """jieba 精确模式分词"""
+    return get_jieba().lcut(text)
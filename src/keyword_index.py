@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Iterable, Iterator, List
+from keyword_matcher import KeywordMatcher
+
+class KeywordIndex:
+    """关键词倒排索引：关键词编号 -> 文章位图（Python 整数，第 i 位表示第 i 篇文章）
+
+    对文章窗口扫描一遍建立索引，之后每个分组的判断只是位图的交、并、差运算，
+    代价与其倒排表大小相当，不再重新扫描文章。
+    """
+
+    def __init__(self, matcher: KeywordMatcher, texts: Iterable[str]):
+        self.matcher = matcher
+        postings: List[List[int]] = [[] for _ in matcher.keywords]
+        size = 0
+        for doc_id, text in enumerate(texts):
+            for keyword_id in matcher.find(text):
+                postings[keyword_id].append(doc_id)
+            size = doc_id + 1
+        self.size = size
+        self.all_docs = (1 << size) - 1
+        self.postings: List[int] = [self._to_bitmap(doc_ids, size) for doc_ids in postings]
+
+    @staticmethod
+    def _to_bitmap(doc_ids: List[int], size: int) -> int:
+        """有序文章编号列表转换为位图"""
+        if not doc_ids:
+            return 0
+        buffer = bytearray((size + 7) // 8)
+        for doc_id in doc_ids:
+            buffer[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def posting(self, keyword: str) -> int:
+        """关键词的文章位图"""
+        return self.postings[self.matcher.keyword_id(keyword)]
+
+    def evaluate(self, must: Iterable[int], exclude: Iterable[int], keywords: Iterable[int]) -> int:
+        """分组求值：必须词取交集，普通词取并集，再减去排除词"""
+        result = self.all_docs
+        for keyword_id in must:
+            result &= self.postings[keyword_id]
+        keywords = list(keywords)
+        if keywords:
+            union = 0
+            for keyword_id in keywords:
+                union |= self.postings[keyword_id]
+            result &= union
+        for keyword_id in exclude:
+            result &= ~self.postings[keyword_id]
+        return result
+
+    @staticmethod
+    def doc_ids(bitmap: int) -> Iterator[int]:
+        """按升序遍历位图中的文章编号（按字节展开，避免对大整数逐位移位）"""
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            base = byte_index << 3
+            while byte:
+                lowest = byte & -byte
+                yield base + lowest.bit_length() - 1
+                byte ^= lowest
+
+    @staticmethod
+    def count(bitmap: int) -> int:
+        """位图中的文章数"""
+        return bin(bitmap).count('1')
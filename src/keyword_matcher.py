@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+class KeywordMatcher:
+    """Aho-Corasick 多模式匹配器：一次扫描文本即可得到全部命中的关键词
+
+    关键词统一转为小写，调用 find 时传入的文本也应为小写。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for keyword in keywords:
+            self._register(keyword)
+        self._build()
+
+    def _register(self, keyword: str) -> int:
+        """登记关键词并返回其编号（重复关键词返回已有编号）"""
+        keyword = keyword.lower()
+        if keyword not in self._ids:
+            self._ids[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+        return self._ids[keyword]
+
+    def keyword_id(self, keyword: str) -> int:
+        """关键词编号"""
+        return self._ids[keyword.lower()]
+
+    def _build(self) -> None:
+        """构建 goto / fail / output 表"""
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+        # 空关键词与任何文本都匹配（与 `'' in text` 一致）
+        self._always: Tuple[int, ...] = tuple(i for i, kw in enumerate(self.keywords) if not kw)
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    outputs.append(set())
+                node = next_node
+            outputs[node].add(keyword_id)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                outputs[child] |= outputs[self._fail[child]]
+
+        self._outputs: List[Tuple[int, ...]] = [tuple(sorted(out)) for out in outputs]
+
+    def find(self, text: str) -> Set[int]:
+        """扫描一遍文本，返回命中的关键词编号集合"""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        hits = set(self._always)
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                hits.update(outputs[node])
+        return hits
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """扫描一遍文本，返回命中的关键词"""
+        return {self.keywords[keyword_id] for keyword_id in self.find(text)}
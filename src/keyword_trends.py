@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import base64
+import logging
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from fetch_cache import read_json_file, write_json_file
+
+_EPOCH = datetime(1970, 1, 1)
+_HOUR = timedelta(hours=1)
+_MAX_COUNT = 0xFFFF
+
+def hour_of(moment: datetime) -> int:
+    """本地时间所在的小时序号（自 1970-01-01 00:00 起的整小时数）"""
+    return (moment.replace(tzinfo=None) - _EPOCH) // _HOUR
+
+class _Series:
+    """单个关键词的小时计数环形缓冲区：下标为 小时序号 % 跨度，last_hour 之后的槽位视为 0"""
+    __slots__ = ('counts', 'last_hour')
+
+    def __init__(self, horizon: int, counts: Optional[array] = None, last_hour: int = -1):
+        self.counts = counts if counts is not None else array('H', bytes(2 * horizon))
+        self.last_hour = last_hour
+
+    def add(self, hour: int, horizon: int) -> None:
+        """计入一次命中；时间推进时只清零跳过的槽位（均摊 O(1)）"""
+        counts = self.counts
+        if hour > self.last_hour:
+            for h in range(max(self.last_hour + 1, hour - horizon + 1), hour + 1):
+                counts[h % horizon] = 0
+            self.last_hour = hour
+        elif hour <= self.last_hour - horizon:
+            return
+        slot = hour % horizon
+        if counts[slot] < _MAX_COUNT:
+            counts[slot] += 1
+
+    def total(self, start: int, end: int, horizon: int) -> int:
+        """小时区间 [start, end] 内的命中数（超出缓冲区范围的部分按 0 计）"""
+        start = max(start, self.last_hour - horizon + 1)
+        end = min(end, self.last_hour)
+        counts = self.counts
+        return sum(counts[h % horizon] for h in range(start, end + 1))
+
+class KeywordTrends:
+    """关键词趋势：按小时累计各分组关键词的命中文章数，检测近期突增
+
+    每个关键词一个 uint16 环形数组（跨度默认 30 天 = 720 小时，约 1.4KB），新文章到达时
+    只更新命中的关键词，不必重新扫描历史文章。突增判断：最近 window_hours 小时的命中数
+    与此前基线期（跨度内其余已记录的小时）按同等时长折算的期望值之比。
+    状态保存在缓存目录的 JSON 中（各关键词的计数数组 base64 编码）。
+    """
+
+    def __init__(self, state_file: str = "cache/keyword_trends.json", horizon_days: int = 30):
+        self.state_file = state_file
+        self.horizon = max(1, int(horizon_days)) * 24
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._series: Dict[str, _Series] = {}
+        self._dirty = False
+        # 开始记录的小时，用于计算基线期的实际时长
+        self.start_hour: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        """读取保存的状态；跨度配置变化或数据损坏时重新开始记录"""
+        data = read_json_file(self.state_file, self.logger)
+        if not data:
+            return
+        if data.get('horizon_hours') != self.horizon:
+            self.logger.info(f"关键词趋势跨度变化，重新开始记录 {self.state_file}")
+            return
+        try:
+            for keyword, (last_hour, encoded) in data.get('keywords', {}).items():
+                counts = array('H')
+                counts.frombytes(base64.b64decode(encoded))
+                if sys.byteorder == 'big':
+                    counts.byteswap()
+                if len(counts) != self.horizon:
+                    raise ValueError(f"{keyword} 计数长度 {len(counts)} 与跨度不符")
+                self._series[keyword] = _Series(self.horizon, counts, int(last_hour))
+            self.start_hour = data.get('start_hour')
+        except (ValueError, TypeError) as e:
+            self.logger.warning(f"加载关键词趋势失败，将重新开始记录 {self.state_file}: {e}")
+            self._series = {}
+            self.start_hour = None
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def update(self, articles: List[Dict[str, Any]], rules, text_of, now: datetime) -> int:
+        """计入一批新文章（每篇文章只应计入一次），返回命中次数
+
+        rules 为编译后的分组规则集（RuleSet），text_of(article) 返回文章的小写匹配文本。
+        """
+        horizon = self.horizon
+        now_hour = hour_of(now)
+        hits = 0
+        with self._lock:
+            if self.start_hour is None:
+                self.start_hour = now_hour
+            for article in articles:
+                term_ids = rules.find(text_of(article))
+                if not term_ids:
+                    continue
+                published = article.get('published')
+                hour = min(hour_of(published), now_hour) if published else now_hour
+                self.start_hour = min(self.start_hour, hour)
+                for term_id in term_ids:
+                    keyword = rules.entry(term_id)
+                    series = self._series.get(keyword)
+                    if series is None:
+                        series = self._series[keyword] = _Series(horizon)
+                    series.add(hour, horizon)
+                    hits += 1
+            self._dirty = True
+        return hits
+
+    def counts(self, keyword: str, now: datetime, hours: int) -> int:
+        """关键词最近 hours 小时的命中数"""
+        series = self._series.get(keyword)
+        if series is None:
+            return 0
+        now_hour = hour_of(now)
+        return series.total(now_hour - hours + 1, now_hour, self.horizon)
+
+    def spikes(self, keywords: List[str], now: datetime, window_hours: int = 24,
+               ratio: float = 3.0, min_count: int = 3) -> List[Dict[str, Any]]:
+        """检测突增关键词，按倍数从高到低返回 {'keyword', 'count', 'expected', 'ratio'}
+
+        期望值 = 基线期命中数 / 基线期小时数 × window_hours，至少按 1 计，避免冷门词偶发命中被放大。
+        基线期不足一个窗口时（刚开始记录）不做判断。
+        """
+        horizon = self.horizon
+        now_hour = hour_of(now)
+        window_start = now_hour - window_hours + 1
+        if self.start_hour is None:
+            return []
+        baseline_start = max(self.start_hour, now_hour - horizon + 1)
+        baseline_hours = window_start - baseline_start
+        if baseline_hours < window_hours:
+            return []
+
+        result = []
+        with self._lock:
+            for keyword in dict.fromkeys(keywords):
+                series = self._series.get(keyword)
+                if series is None or series.last_hour < window_start:
+                    continue
+                count = series.total(window_start, now_hour, horizon)
+                if count < min_count:
+                    continue
+                baseline = series.total(baseline_start, window_start - 1, horizon)
+                expected = baseline / baseline_hours * window_hours
+                factor = count / max(expected, 1.0)
+                if factor >= ratio:
+                    result.append({'keyword': keyword, 'count': count,
+                                   'expected': round(expected, 2), 'ratio': round(factor, 2)})
+        result.sort(key=lambda x: (-x['ratio'], -x['count']))
+        return result
+
+    def save(self, now: datetime) -> None:
+        """写回状态文件；跨度内已无命中的关键词（含已从分组配置中删除的）一并清理"""
+        now_hour = hour_of(now)
+        with self._lock:
+            if not self._dirty:
+                return
+            for keyword in [k for k, s in self._series.items() if s.last_hour <= now_hour - self.horizon]:
+                del self._series[keyword]
+            keywords = {}
+            for keyword, series in sorted(self._series.items()):
+                counts = array('H', series.counts)
+                if sys.byteorder == 'big':
+                    counts.byteswap()
+                keywords[keyword] = [series.last_hour, base64.b64encode(counts.tobytes()).decode('ascii')]
+            data = {'horizon_hours': self.horizon, 'start_hour': self.start_hour, 'keywords': keywords}
+            self._dirty = False
+        write_json_file(self.state_file, data, self.logger)
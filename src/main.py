@@ -13,6 +13,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from rss_fetcher import RSSFetcher
 from content_filter import ContentFilter
 from daily_generator import DailyGenerator
+from text_cache import TextCache
+import jieba_loader
+from relevance import BM25Ranker
 from feishu_sender import FeishuSender
 from word_group_parser import WordGroupParser
 
@@ -42,35 +45,52 @@ class RSSDailyProcessor:
         
         # 初始化各个模块
         self.fetcher = RSSFetcher()
-        self.filter = ContentFilter()
-        self.generator = DailyGenerator()
+        # jieba 词典缓存与抓取缓存放在同一目录，便于 CI 一并恢复
+        jieba_loader.set_cache_dir(self.fetcher.cache_dir)
+        # 筛选与日报统计共用同一份文章文本缓存
+        text_cache = TextCache()
+        self.filter = ContentFilter(text_cache)
+        self.generator = DailyGenerator(text_cache)
+        self.word_groups = WordGroupParser()
         self.sender = FeishuSender()
     
     def process_daily_report(self, webhook_url: str = None) -> bool:
         """处理日报生成和发送的完整流程（分组统计+飞书推送）"""
         try:
             self.logger.info("开始处理日报生成流程（分组统计模式）")
-            # 1. 获取 RSS 数据
-            all_articles = self.fetcher.fetch_all_feeds()
-            if not all_articles:
-                self.logger.warning("未获取到任何文章")
-                return self._send_empty_report(webhook_url)
-            # 2. 筛选最近的文章
-            recent_articles = self.fetcher.filter_recent_articles(all_articles, hours=24)
+            # 1. 读取分组配置（编译后的规则集按文件修改时间与内容哈希缓存）
+            rules = self.word_groups.compile()
+            # 分组关键词登记为 jieba 用户词典（按文件哈希缓存），抓取入库时的分词即可将每个关键词切为一个词
+            jieba_loader.register_keywords(rules.literal_keywords(), rules.digest)
+            self.generator.rules = rules
+            # 2. 获取 RSS 数据（时间窗口在抓取阶段即生效，启用文章库时只返回新文章；到达抓取时限时返回部分结果）
+            new_articles = self.fetcher.fetch_all_feeds(hours=24)
+            missing_text = self.generator.format_missing_sources(self.fetcher.skipped_sources)
+            # 新文章计入关键词小时计数，检测相对基线的突增
+            spike_text = self._update_keyword_trends(new_articles, rules)
+            # 3. 获取最近 24 小时的完整文章窗口
+            recent_articles = self.fetcher.get_recent_articles(new_articles, hours=24)
             if not recent_articles:
                 self.logger.warning("最近24小时内没有文章")
-                return self._send_empty_report(webhook_url)
-            # 3. 读取分组配置
-            parser = WordGroupParser()
-            groups = parser.parse()
-            # 4. 分组过滤统计
-            group_results = self.filter.filter_by_groups(recent_articles, groups)
-            # 5. 生成分组统计文本
+                return self._send_empty_report(webhook_url, missing_text)
+            # 4. 相关性评分：语料统计取自文章库的增量统计，无文章库时由当前窗口临时统计
+            ranker = None
+            if self.fetcher.relevance_ranking:
+                store = self.fetcher.article_store
+                ranker = BM25Ranker.from_store(store) if store is not None else self.filter.build_ranker(recent_articles)
+            # 5. 分组过滤统计（组内按相关性取前 max_daily_items 篇）
+            group_results = self.filter.filter_by_groups(recent_articles, rules, ranker,
+                                                         top_k=self.fetcher.max_daily_items or None)
+            # 6. 生成分组统计文本
             trendar_text = self.generator.generate_trendar_style_report(group_results)
             if not trendar_text.strip():
                 self.logger.warning("分组统计后无内容")
-                return self._send_empty_report(webhook_url)
-            # 6. 发送到飞书
+                return self._send_empty_report(webhook_url, missing_text)
+            if spike_text:
+                trendar_text = f"{spike_text}\n\n{trendar_text}"
+            if missing_text:
+                trendar_text = f"{trendar_text}\n{missing_text}"
+            # 7. 发送到飞书
             success = self.sender.send_text_message(trendar_text, webhook_url)
             if success:
                 self.logger.info("日报处理完成，发送成功")
@@ -81,10 +101,24 @@ class RSSDailyProcessor:
             self.logger.error(f"处理日报时发生错误: {e}", exc_info=True)
             return False
     
-    def _send_empty_report(self, webhook_url: str = None) -> bool:
+    def _update_keyword_trends(self, new_articles: List[Dict[str, Any]], rules) -> str:
+        """更新关键词趋势并返回突增说明文本（未启用时返回空字符串）"""
+        trends = self.fetcher.keyword_trends
+        if trends is None:
+            return ""
+        now = self.fetcher.now()
+        hits = trends.update(new_articles, rules, self.filter.text_cache.text, now)
+        trends.save(now)
+        spikes = trends.spikes(rules.entries(), now, ratio=self.fetcher.trend_spike_ratio)
+        self.logger.info(f"关键词趋势：新文章命中 {hits} 次，突增关键词 {len(spikes)} 个")
+        return self.generator.format_keyword_spikes(spikes)
+    
+    def _send_empty_report(self, webhook_url: str = None, note: str = "") -> bool:
         """发送空报告（分组统计模式）"""
         try:
             empty_text = "今日暂无重要资讯。"
+            if note:
+                empty_text = f"{empty_text}\n\n{note}"
             return self.sender.send_text_message(empty_text, webhook_url)
         except Exception as e:
             self.logger.error(f"发送空报告失败: {e}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+_NON_WORD_RE = re.compile(r'[\W_]+')
+_EMPTY = 1 << 32
+
+class NearDuplicateIndex:
+    """近似重复文章聚类：标题与摘要开头的字符 shingle → MinHash 签名 → LSH 分段分桶
+
+    签名采用单次哈希分桶的 MinHash（每个 shingle 只哈希一次，按哈希值分到各个桶取最小值，
+    空桶向后借值补齐）。签名切成若干段，任意一段完全相同的文章才成为候选对，
+    再用签名估计的 Jaccard 相似度确认，因此聚类代价与候选对数量相当，而不是文章数的平方。
+    """
+
+    def __init__(self, shingle_size: int = 3, num_hashes: int = 64, bands: int = 16,
+                 threshold: float = 0.5, summary_chars: int = 80):
+        if num_hashes % bands:
+            raise ValueError("num_hashes 必须是 bands 的整数倍")
+        self.shingle_size = shingle_size
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.threshold = threshold
+        # 摘要只取开头部分：转载稿的导语基本一致，全文摘要长短差异很大
+        self.summary_chars = summary_chars
+
+    def _text(self, article: Dict[str, Any]) -> str:
+        """参与比较的规范化文本（小写，去掉空白与标点）"""
+        text = f"{article.get('title', '')} {article.get('summary', '')[:self.summary_chars]}"
+        return _NON_WORD_RE.sub('', text.lower())
+
+    def signature(self, article: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+        """文章的 MinHash 签名；文本为空时返回 None"""
+        text = self._text(article)
+        if not text:
+            return None
+        size = min(self.shingle_size, len(text))
+        k = self.num_hashes
+        bins = [_EMPTY] * k
+        for shingle in {text[i:i + size] for i in range(len(text) - size + 1)}:
+            # crc32 再乘黄金分割常数打散
+            h = (zlib.crc32(shingle.encode('utf-8')) * 0x9E3779B1) & 0xFFFFFFFF
+            index, value = h % k, h // k
+            if value < bins[index]:
+                bins[index] = value
+        # 空桶向后循环借用最近的非空桶，并加上偏移区分来源
+        for i in range(k):
+            if bins[i] == _EMPTY:
+                for step in range(1, k):
+                    value = bins[(i + step) % k]
+                    if value < _EMPTY:
+                        bins[i] = step * _EMPTY + value
+                        break
+        return tuple(bins)
+
+    def similarity(self, a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        """由签名估计的 Jaccard 相似度"""
+        return sum(x == y for x, y in zip(a, b)) / self.num_hashes
+
+    def cluster(self, articles: List[Dict[str, Any]]) -> List[List[int]]:
+        """聚类，返回文章下标分组（组内与组间均按首次出现顺序）"""
+        parent = list(range(len(articles)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        signatures = [self.signature(article) for article in articles]
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        for i, signature in enumerate(signatures):
+            if signature is None:
+                continue
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows])
+                members = buckets.setdefault(key, [])
+                for j in members:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j and self.similarity(signature, signatures[j]) >= self.threshold:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+                members.append(i)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(articles)):
+            clusters.setdefault(find(i), []).append(i)
+        return list(clusters.values())
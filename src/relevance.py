@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from tokenizer import tokenize
+
+T = TypeVar('T')
+
+def query_terms(keywords: Iterable[str]) -> List[str]:
+    """关键词分词后的查询词（去重，保持顺序）"""
+    terms: Dict[str, None] = {}
+    for keyword in keywords:
+        for term in tokenize(keyword.lower()):
+            terms[term] = None
+    return list(terms)
+
+class BM25Ranker:
+    """BM25 相关性评分
+
+    语料统计（文档数、平均长度、文档频率）来自文章库的增量统计，排序时只需查询用到的查询词，
+    不必重新扫描语料；没有文章库时也可以由待排序的文章窗口临时构建。
+    """
+
+    def __init__(self, doc_count: int, avg_length: float,
+                 doc_freq: Callable[[Sequence[str]], Dict[str, int]],
+                 k1: float = 1.5, b: float = 0.75):
+        self.doc_count = doc_count
+        self.avg_length = avg_length or 1.0
+        self.k1 = k1
+        self.b = b
+        self._doc_freq = doc_freq
+        self._idf: Dict[str, float] = {}
+
+    @classmethod
+    def from_store(cls, store, **kwargs) -> 'BM25Ranker':
+        """使用文章库维护的文档频率"""
+        doc_count, avg_length = store.corpus_stats()
+        return cls(doc_count, avg_length, store.document_frequencies, **kwargs)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, int]], **kwargs) -> 'BM25Ranker':
+        """由一组文档的词频临时统计"""
+        doc_freq: Dict[str, int] = {}
+        doc_count = total_length = 0
+        for counts in documents:
+            doc_count += 1
+            total_length += sum(counts.values())
+            for term in counts:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+        avg_length = total_length / doc_count if doc_count else 1.0
+        return cls(doc_count, avg_length, lambda terms: {t: doc_freq[t] for t in terms if t in doc_freq}, **kwargs)
+
+    def idf(self, terms: Sequence[str]) -> Dict[str, float]:
+        """查询词的 IDF（按需查询文档频率并缓存）"""
+        missing = [term for term in terms if term not in self._idf]
+        if missing:
+            doc_freq = self._doc_freq(missing)
+            n = self.doc_count
+            for term in missing:
+                df = doc_freq.get(term, 0)
+                self._idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        return {term: self._idf[term] for term in terms}
+
+    def score(self, terms: Sequence[str], counts: Dict[str, int]) -> float:
+        """文档对查询词的 BM25 得分"""
+        idf = self.idf(terms)
+        length = sum(counts.values())
+        norm = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return score
+
+    def top_k(self, items: Sequence[T], terms: Sequence[str],
+              counts_of: Callable[[T], Dict[str, int]], k: Optional[int] = None) -> List[Tuple[float, T]]:
+        """按得分从高到低返回 (得分, 条目)；指定 k 时用堆只取前 k 个，同分保持原顺序"""
+        self.idf(terms)
+        scored = ((self.score(terms, counts_of(item)), -index, item) for index, item in enumerate(items))
+        if k is None:
+            ranked = sorted(scored, key=lambda x: (x[0], x[1]), reverse=True)
+        else:
+            ranked = heapq.nlargest(k, scored, key=lambda x: (x[0], x[1]))
+        return [(score, item) for score, _, item in ranked]
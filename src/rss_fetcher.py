@@ -1,20 +1,48 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import feedparser
 import requests
+from requests.adapters import HTTPAdapter
+from lxml import etree
 import json
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import time
-import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import os
+import time
+import threading
+import multiprocessing
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, wait
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
+from host_scheduler import HostScheduler, parse_retry_after
+from fetch_cache import ValidatorCache, FeedBodyCache
+from article_store import ArticleStore
+from source_health import SourceHealth
+from url_index import UrlIndex
+from keyword_trends import KeywordTrends
+from tokenizer import KeywordSet
+from text_normalize import match_text
+from article import Article, set_timezone as set_article_timezone
+from feed_stream import (iter_feed_items, element_to_entry, element_published, entry_hash,
+                         parse_feed_entries, ParsedEntry, MalformedFeedError)
+
+# 项目根目录（src 的上一级）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 class RSSFetcher:
     """RSS 数据获取模块"""
     
     def __init__(self, config_file: str = "config/rss_sources.json"):
+        # 设置日志
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+        
         self.config_file = config_file
         self.config = self._load_config()
         self.session = requests.Session()
@@ -22,12 +50,122 @@ class RSSFetcher:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # 设置日志
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        # 并发设置：全局工作线程数与单主机并发上限
+        settings = self.config.get('global_settings', {})
+        self.max_workers = max(1, int(settings.get('max_workers', 8)))
+        self.per_host_concurrency = max(1, int(settings.get('per_host_concurrency', 2)))
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        
+        # 按主机限速：只有同一主机的连续请求才需要等待
+        self.scheduler = HostScheduler(
+            rate=float(settings.get('host_rate_limit', 0.5)),
+            burst=float(settings.get('host_burst', 1))
         )
-        self.logger = logging.getLogger(__name__)
+        self.max_retries = max(0, int(settings.get('max_retries', 1)))
+        self.max_retry_wait = float(settings.get('max_retry_wait', 30))
+        self.request_timeout = float(settings.get('request_timeout', 30))
+        self.probe_timeout = float(settings.get('probe_timeout', 10))
+        
+        # 抓取阶段的整体时限（秒），到时返回已完成的结果；0 表示不限
+        self.fetch_deadline = float(settings.get('fetch_deadline_seconds', 0))
+        self.skipped_sources: List[Dict[str, str]] = []
+        
+        # 解析进程池：feedparser 为纯 Python，解析放到子进程以利用多核并与下载重叠；
+        # 源数量或文档较小时在当前进程解析，避免进程启动开销
+        self.parse_processes = int(settings.get('parse_processes', os.cpu_count() or 1))
+        self.parse_pool_min_sources = int(settings.get('parse_pool_min_sources', 8))
+        self.parse_pool_min_bytes = int(settings.get('parse_pool_min_bytes', 64 * 1024))
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        
+        # 缓存目录：相对路径按项目根目录解析，与运行时的工作目录无关（CI 中在 src 目录下运行）
+        self.cache_dir = settings.get('cache_dir', 'cache')
+        if not os.path.isabs(self.cache_dir):
+            self.cache_dir = os.path.join(PROJECT_ROOT, self.cache_dir)
+        
+        # 条件请求缓存（ETag / Last-Modified），保存在 cache 目录供下次运行使用
+        self.conditional_get = bool(settings.get('conditional_get', True))
+        self.validator_cache = ValidatorCache(os.path.join(self.cache_dir, 'http_cache.json'))
+        
+        # 正文哈希缓存：对不支持验证器的源，正文不变时跳过解析，变化时只解析新条目
+        self.content_hash_cache = bool(settings.get('content_hash_cache', True))
+        self.feed_cache = FeedBodyCache(os.path.join(self.cache_dir, 'feed_cache.json'))
+        
+        # 跨天链接去重：最近 url_index_days 天见过的规范化链接（去掉跟踪参数、移动版/AMP 变体）不再重复处理
+        self.url_index = None
+        if settings.get('url_index', True):
+            self.url_index = UrlIndex(
+                os.path.join(self.cache_dir, 'url_index.json'),
+                retention_days=int(settings.get('url_index_days', 7))
+            )
+        
+        # 源级预筛选：按各源的 keywords / exclude_keywords 在抓取时丢弃不可能入选的条目（每个源只编译一次）
+        self.source_prefilter = bool(settings.get('source_prefilter', True))
+        self._source_filters: Dict[str, Tuple[Optional[KeywordSet], Optional[KeywordSet]]] = {}
+        self.prefilter_stats: Dict[str, Dict[str, int]] = {}
+        self._prefilter_lock = threading.Lock()
+        
+        # 并发抓取时每个源任务的状态变更缓冲（见 _defer）
+        self._pending = threading.local()
+        
+        # 摘要在入库前去掉 HTML、合并空白并截断，同时附带小写匹配文本，后续各阶段不再重复处理
+        self.summary_max_chars = int(settings.get('summary_max_chars', 500))
+        
+        # 流式解析：基于 lxml iterparse 逐条产出，达到 max_items 后停止解析
+        self.streaming_parser = bool(settings.get('streaming_parser', False))
+        
+        # 连接池大小与工作线程数保持一致，避免连接被丢弃
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # 发布时间统一转换为配置时区下的本地时间，与时间窗口使用同一基准
+        self.timezone = self._load_timezone(settings.get('timezone'))
+        set_article_timezone(self.timezone)
+        
+        # 源健康状态与熔断器：连续失败的源按指数退避跳过，恢复前用较短超时探测
+        self.health = SourceHealth(
+            os.path.join(self.cache_dir, 'source_health.json'),
+            failure_threshold=int(settings.get('circuit_failure_threshold', 3)),
+            backoff_hours=float(settings.get('circuit_backoff_hours', 24)),
+            max_backoff_hours=float(settings.get('circuit_max_backoff_hours', 384))
+        )
+        
+        # 文章库：记录已见条目，抓取只输出新文章，完整时间窗口从库中查询；
+        # 启用相关性排序时同时增量维护文档频率
+        self.relevance_ranking = bool(settings.get('relevance_ranking', True))
+        # 报告中每组最多列出的报道数（按相关性取前若干篇，0 表示不限）
+        self.max_daily_items = max(0, int(settings.get('max_daily_items', 50)))
+        self.article_store = None
+        if settings.get('article_store', True):
+            self.article_store = ArticleStore(
+                os.path.join(self.cache_dir, 'articles.db'),
+                retention_days=int(settings.get('article_retention_days', 30)),
+                index_terms=self.relevance_ranking
+            )
+        
+        # 关键词趋势：分组关键词的小时命中计数（环形数组，跨度 trend_horizon_days 天），用于检测突增；
+        # 只计入新文章，因此需要文章库或链接去重索引保证每篇文章只计一次
+        self.keyword_trends = None
+        self.trend_spike_ratio = float(settings.get('trend_spike_ratio', 3.0))
+        if settings.get('keyword_trends', True):
+            if self.article_store is None and self.url_index is None:
+                self.logger.warning("关键词趋势需要启用 article_store 或 url_index，已关闭")
+            else:
+                self.keyword_trends = KeywordTrends(
+                    os.path.join(self.cache_dir, 'keyword_trends.json'),
+                    horizon_days=int(settings.get('trend_horizon_days', 30))
+                )
+    
+    def _load_timezone(self, name: Optional[str]) -> Optional[ZoneInfo]:
+        """加载时区配置，未配置或无效时使用系统本地时区"""
+        if not name:
+            return None
+        try:
+            return ZoneInfo(name)
+        except Exception as e:
+            self.logger.warning(f"无效的时区配置 {name}，使用系统本地时区: {e}")
+            return None
     
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
@@ -41,75 +179,495 @@ class RSSFetcher:
             self.logger.error(f"加载配置文件失败: {e}")
             return {"sources": [], "global_settings": {}}
     
-    def fetch_rss_feed(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """获取单个 RSS 源的数据"""
+    def _request(self, source: Dict[str, Any]) -> requests.Response:
+        """按主机限速发起请求，遇到 429/503 时遵循 Retry-After 重试"""
+        url = source['url']
+        attempt = 0
+        # 最近失败过的源使用较短的探测超时，避免拖慢整次运行
+        failing = self.health.get(url).get('consecutive_failures', 0) > 0
+        timeout = min(self.probe_timeout, self.request_timeout) if failing else self.request_timeout
+        while True:
+            self.scheduler.acquire(url, source.get('rate_limit'), source.get('burst'))
+            # 只有能复用上次解析结果时才发送条件请求，否则 304 无内容可用
+            conditional = self.conditional_get and self.feed_cache.body_hash(url) is not None
+            headers = self.validator_cache.request_headers(url) if conditional else {}
+            response = self.session.get(url, timeout=timeout, headers=headers)
+            if response.status_code not in (429, 503):
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            delay = retry_after if retry_after is not None else 1 / max(self.scheduler.default_rate, 0.1)
+            # 无论是否重试，都让同主机的其他源暂停
+            self.scheduler.penalize(url, delay)
+            if attempt >= self.max_retries or delay > self.max_retry_wait:
+                return response
+            attempt += 1
+            self.logger.warning(f"{source['name']} 返回 {response.status_code}，{delay:.1f} 秒后重试")
+    
+    def now(self) -> datetime:
+        """当前时间（配置时区下的本地时间，不带时区信息）"""
+        if self.timezone is None:
+            return datetime.now()
+        return datetime.now(self.timezone).replace(tzinfo=None)
+    
+    def _from_utc(self, utc_time: datetime) -> datetime:
+        """将不带时区的 UTC 时间转换为配置时区下的本地时间"""
+        return utc_time.replace(tzinfo=timezone.utc).astimezone(self.timezone).replace(tzinfo=None)
+    
+    def _make_cutoff(self, hours: Optional[int]) -> Optional[datetime]:
+        """根据小时数计算时间窗口起点"""
+        if hours is None:
+            return None
+        return self.now() - timedelta(hours=hours)
+    
+    def _feedparse(self, body: bytes) -> List[ParsedEntry]:
+        """用 feedparser 解析文档：启用进程池且文档足够大时交给子进程，否则在当前进程解析"""
+        pool = self._parse_pool
+        future = None
+        if pool is not None and len(body) >= self.parse_pool_min_bytes:
+            try:
+                future = pool.submit(parse_feed_entries, body)
+            except RuntimeError:
+                # 进程池已关闭（抓取时限已到），退回当前进程
+                future = None
+        if future is not None:
+            warning, entries = future.result()
+        else:
+            warning, entries = parse_feed_entries(body)
+        
+        if warning:
+            self.logger.warning(f"RSS 解析警告: {warning}")
+        return entries
+    
+    def _entry_to_article(self, entry: ParsedEntry, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """将解析出的条目转换为文章字典"""
+        if entry.title is None or entry.link is None:
+            self.logger.error(f"解析文章失败: 条目缺少标题或链接 ({source['name']})")
+            return None
+        
+        # 解析发布时间（feedparser 的 *_parsed 均为 UTC）
+        published_time = self._from_utc(datetime(*entry.published)) if entry.published else None
+        return Article.create(
+            entry.id, entry.title, entry.link, published_time if published_time else self.now(),
+            entry.summary, source['name'], source['url'], self.summary_max_chars
+        )
+    
+    def _parse_full(self, body: bytes, source: Dict[str, Any],
+                    cutoff: datetime = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """整体解析源文档，返回 [(条目哈希, 文章), ...]"""
+        pairs = []
+        max_items = source.get('max_items', 20)
+        date_ordered = bool(source.get('date_ordered', False))
+        for entry in self._feedparse(body):
+            article = self._entry_to_article(entry, source)
+            if article is None:
+                continue
+            if cutoff is not None and article['published'] < cutoff:
+                if date_ordered:
+                    break
+                continue
+            key = '|'.join((entry.id, entry.link, entry.title, entry.summary))
+            pairs.append((hashlib.sha1(key.encode('utf-8')).hexdigest(), article))
+            if len(pairs) >= max_items:
+                break
+        return pairs
+    
+    def _split_items(self, body: bytes) -> Optional[Tuple[Any, List[Tuple[str, Any]], bool]]:
+        """用 lxml 按条目拆分源文档，返回 (根节点, [(条目哈希, 条目节点), ...], 是否为格式良好的 XML)"""
+        try:
+            parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+            root = etree.fromstring(body.strip(), parser=parser)
+        except Exception:
+            return None
+        if root is None:
+            return None
+        
+        items = [(entry_hash(element), element) for element in root.iter('{*}item', '{*}entry')]
+        return root, items, len(parser.error_log) == 0
+    
+    def _in_window(self, published: Optional[datetime], cutoff: Optional[datetime]) -> bool:
+        """判断发布时间是否在时间窗口内（无发布时间的条目视为最新）"""
+        return cutoff is None or published is None or published >= cutoff
+    
+    def _parse_streaming(self, body: bytes, source: Dict[str, Any],
+                         known: Dict[str, Dict[str, Any]] = None,
+                         cutoff: datetime = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """流式解析源文档，达到 max_items 或（按时间排序的源）超出时间窗口后立即停止"""
+        known = known or {}
+        max_items = source.get('max_items', 20)
+        date_ordered = bool(source.get('date_ordered', False))
+        pairs = []
+        seen = 0
+        try:
+            for item_hash, element in iter_feed_items(body):
+                seen += 1
+                if item_hash in known:
+                    article = self.feed_cache.materialize(known[item_hash], source)
+                    published = article['published']
+                else:
+                    # 先只取发布时间，窗口外的条目不再提取正文
+                    published = element_published(element)
+                    if published is not None:
+                        published = self._from_utc(published)
+                    article = None
+                if not self._in_window(published, cutoff):
+                    if date_ordered:
+                        break
+                    continue
+                if article is None:
+                    entry = element_to_entry(element)
+                    article = Article.create(
+                        entry['id'], entry['title'], entry['link'], published if published else self.now(),
+                        entry['summary'], source['name'], source['url'], self.summary_max_chars
+                    )
+                pairs.append((item_hash, article))
+                if len(pairs) >= max_items:
+                    break
+        except (etree.XMLSyntaxError, MalformedFeedError) as e:
+            self.logger.warning(f"{source['name']} 流式解析失败，改为整体解析: {e}")
+            return self._parse_full(body, source, cutoff)
+        
+        if seen == 0:
+            return self._parse_full(body, source, cutoff)
+        return pairs
+    
+    def _parse_with_hash_cache(self, body: bytes, source: Dict[str, Any],
+                               cutoff: datetime = None) -> List[Dict[str, Any]]:
+        """按正文哈希与条目哈希增量解析：正文不变时直接复用，变化时只解析新条目"""
+        url = source['url']
+        max_items = source.get('max_items', 20)
+        body_hash = hashlib.sha1(body).hexdigest()
+        
+        if self.feed_cache.body_hash(url) == body_hash:
+            articles = self._cached_articles(source, cutoff)
+            self.logger.info(f"{source['name']} 正文未变化，复用上次解析的 {len(articles)} 篇文章")
+            return articles
+        
+        known = self.feed_cache.known_entries(url)
+        if source.get('streaming_parser', self.streaming_parser):
+            pairs = self._parse_streaming(body, source, known, cutoff)
+            parsed = sum(1 for entry_hash, _ in pairs if entry_hash not in known)
+            self._defer(self.feed_cache.store, url, body_hash, pairs, parsed)
+            return [article for _, article in pairs]
+        
+        split = self._split_items(body)
+        if split is None:
+            pairs = self._parse_full(body, source, cutoff)
+            self._defer(self.feed_cache.store, url, body_hash, pairs, len(pairs))
+            return [article for _, article in pairs]
+        
+        root, items, well_formed = split
+        if not well_formed:
+            # 文档不是格式良好的 XML（未转义的 &、HTML 实体等）：lxml 修复后再序列化会损坏标题、摘要和链接，
+            # 因此原始文档整体交给 feedparser，lxml 只用于逐条目哈希
+            return self._parse_malformed(body, source, items, cutoff)
+        
+        # 按时间窗口和 max_items 选出需要保留的条目，窗口外的条目不交给 feedparser
+        date_ordered = bool(source.get('date_ordered', False))
+        kept = []
+        for entry_hash, element in items:
+            if entry_hash in known:
+                published = FeedBodyCache.published_of(known[entry_hash])
+            else:
+                published = element_published(element)
+                if published is not None:
+                    published = self._from_utc(published)
+            if not self._in_window(published, cutoff):
+                if date_ordered:
+                    break
+                continue
+            kept.append((entry_hash, element))
+            if len(kept) >= max_items:
+                break
+        new_items = [(entry_hash, element) for entry_hash, element in kept if entry_hash not in known]
+        
+        # 从文档中移除已知条目和未保留的条目，只把新条目交给 feedparser
+        new_hashes = set(entry_hash for entry_hash, _ in new_items)
+        for entry_hash, element in items:
+            if entry_hash not in new_hashes:
+                element.getparent().remove(element)
+        
+        parsed = {}
+        if new_items:
+            entries = self._feedparse(etree.tostring(root))
+            if len(entries) != len(new_items):
+                # 条目无法一一对应时退回整体解析
+                pairs = self._parse_full(body, source, cutoff)
+                self._defer(self.feed_cache.store, url, body_hash, pairs, len(pairs))
+                return [article for _, article in pairs]
+            for (entry_hash, _), entry in zip(new_items, entries):
+                parsed[entry_hash] = self._entry_to_article(entry, source)
+        
+        pairs = []
+        for entry_hash, _ in kept:
+            if entry_hash in parsed:
+                article = parsed[entry_hash]
+            else:
+                article = self.feed_cache.materialize(known[entry_hash], source)
+            if article is not None:
+                pairs.append((entry_hash, article))
+        
+        self._defer(self.feed_cache.store, url, body_hash, pairs, len(new_items))
+        if known:
+            self.logger.info(f"{source['name']} 新条目 {len(new_items)} 个，复用 {len(pairs) - len(parsed)} 个")
+        return [article for _, article in pairs]
+    
+    def _cached_articles(self, source: Dict[str, Any], cutoff: datetime = None) -> List[Dict[str, Any]]:
+        """复用上次保存的解析结果（304 或正文未变化时），按时间窗口与 max_items 过滤"""
+        return [
+            article for article in self.feed_cache.cached_articles(source['url'], source)
+            if self._in_window(article['published'], cutoff)
+        ][:source.get('max_items', 20)]
+    
+    def _parse_malformed(self, body: bytes, source: Dict[str, Any],
+                         items: List[Tuple[str, Any]], cutoff: datetime = None) -> List[Dict[str, Any]]:
+        """用 feedparser 解析原始文档；条目数与 lxml 拆分结果一致时沿用逐条目哈希，否则按条目内容哈希"""
+        url = source['url']
+        body_hash = hashlib.sha1(body).hexdigest()
+        entries = self._feedparse(body)
+        if len(entries) != len(items):
+            pairs = self._parse_full(body, source, cutoff)
+            self._defer(self.feed_cache.store, url, body_hash, pairs, len(pairs))
+            return [article for _, article in pairs]
+        
+        max_items = source.get('max_items', 20)
+        date_ordered = bool(source.get('date_ordered', False))
+        pairs = []
+        for (item_hash, _), entry in zip(items, entries):
+            article = self._entry_to_article(entry, source)
+            if article is None:
+                continue
+            if not self._in_window(article['published'], cutoff):
+                if date_ordered:
+                    break
+                continue
+            pairs.append((item_hash, article))
+            if len(pairs) >= max_items:
+                break
+        self._defer(self.feed_cache.store, url, body_hash, pairs, len(pairs))
+        return [article for _, article in pairs]
+    
+    def fetch_rss_feed(self, source: Dict[str, Any], cutoff: datetime = None) -> List[Dict[str, Any]]:
+        """获取单个 RSS 源的数据，cutoff 之前发布的条目不会生成文章"""
+        started = time.monotonic()
         try:
             self.logger.info(f"正在获取 RSS 源: {source['name']} - {source['url']}")
             
-            # 添加随机延迟避免被限制
-            time.sleep(random.uniform(1, 3))
-            
-            response = self.session.get(source['url'], timeout=30)
-            response.raise_for_status()
-            
-            # 解析 RSS 内容
-            feed = feedparser.parse(response.content)
-            
-            if feed.bozo:
-                self.logger.warning(f"RSS 解析警告: {feed.bozo_exception}")
-            
-            articles = []
-            max_items = source.get('max_items', 20)
-            
-            for entry in feed.entries[:max_items]:
-                try:
-                    # 解析发布时间
-                    published_time = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_time = datetime(*entry.published_parsed[:6])
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_time = datetime(*entry.updated_parsed[:6])
+            response = self._request(source)
+            if response.status_code == 304:
+                self._defer(self.validator_cache.record_hit, source['url'])
+                # 内容未变化：复用上次的解析结果（同日重跑或未启用文章库时报告仍包含该源）
+                articles = self._cached_articles(source, cutoff)
+                self.logger.info(f"{source['name']} 内容未更新 (304)，复用上次解析的 {len(articles)} 篇文章")
+            else:
+                response.raise_for_status()
+                body = response.content
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                
+                if self.content_hash_cache:
+                    articles = self._parse_with_hash_cache(body, source, cutoff)
+                else:
+                    if source.get('streaming_parser', self.streaming_parser):
+                        pairs = self._parse_streaming(body, source, cutoff=cutoff)
                     else:
-                        published_time = None
-                    
-                    article = {
-                        'title': entry.title,
-                        'link': entry.link,
-                        'published': published_time if published_time else datetime.now(),
-                        'summary': getattr(entry, 'summary', ''),
-                        'source': source['name'],
-                        'source_url': source['url']
-                    }
-                    articles.append(article)
-                    
-                except Exception as e:
-                    self.logger.error(f"解析文章失败: {e}")
-                    continue
+                        pairs = self._parse_full(body, source, cutoff)
+                    if self.conditional_get:
+                        # 保存解析结果，下次收到 304 时复用
+                        self._defer(self.feed_cache.store, source['url'], hashlib.sha1(body).hexdigest(), pairs, len(pairs))
+                    articles = [article for _, article in pairs]
+                # 解析成功后才保存新的验证器，避免解析失败后下次收到 304 而永久漏掉这些条目
+                self._defer(self.validator_cache.update, source['url'], response.headers)
+            
+            if self.source_prefilter:
+                articles = self._prefilter(source, articles)
             
             self.logger.info(f"成功获取 {len(articles)} 篇文章来自 {source['name']}")
+            self._defer(self.health.record_success, source['url'], time.monotonic() - started)
             return articles
-            
+        
+        except CancelledError:
+            # 抓取时限已到，解析进程池中的任务被取消：不计为源的失败
+            self.logger.info(f"{source['name']} 解析任务已取消（抓取时限已到）")
+            return []
         except Exception as e:
             self.logger.error(f"获取 RSS 源失败 {source['name']}: {e}")
+            self._defer(self.health.record_failure, source['url'], time.monotonic() - started)
             return []
     
-    def fetch_all_feeds(self) -> List[Dict[str, Any]]:
-        """获取所有 RSS 源的数据"""
+    def _source_filter(self, source: Dict[str, Any]) -> Tuple[Optional[KeywordSet], Optional[KeywordSet]]:
+        """源的 (包含关键词, 排除关键词) 匹配器，首次使用时编译并缓存"""
+        compiled = self._source_filters.get(source['url'])
+        if compiled is None:
+            include = source.get('keywords') or []
+            exclude = source.get('exclude_keywords') or []
+            compiled = (KeywordSet(include) if include else None, KeywordSet(exclude) if exclude else None)
+            with self._prefilter_lock:
+                self._source_filters[source['url']] = compiled
+        return compiled
+    
+    def _prefilter(self, source: Dict[str, Any], articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按源的关键词规则预筛选：须命中任一包含关键词（未配置则不限）且不含排除关键词"""
+        include, exclude = self._source_filter(source)
+        if include is None and exclude is None:
+            return articles
+        
+        kept = []
+        for article in articles:
+            content = article.get('match_text') or match_text(article.get('title', ''), article.get('summary', ''))
+            if exclude is not None and exclude.find(content) is not None:
+                continue
+            if include is not None and include.find(content) is None:
+                continue
+            kept.append(article)
+        
+        with self._prefilter_lock:
+            stats = self.prefilter_stats.setdefault(source['name'], {'checked': 0, 'removed': 0})
+            stats['checked'] += len(articles)
+            stats['removed'] += len(articles) - len(kept)
+        if len(kept) < len(articles):
+            self.logger.info(f"{source['name']} 预筛选移除 {len(articles) - len(kept)} 篇，保留 {len(kept)} 篇")
+        return kept
+    
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """获取 URL 所属主机的并发信号量"""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_concurrency)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def _defer(self, func: Callable[..., None], *args: Any) -> None:
+        """记录一次抓取状态变更（验证器、正文缓存、源健康状态）
+
+        在 fetch_all_feeds 的并发任务中先缓冲，只有结果被采用的源才提交；直接调用 fetch_rss_feed 时立即执行。
+        """
+        changes = getattr(self._pending, 'changes', None)
+        if changes is None:
+            func(*args)
+        else:
+            changes.append(functools.partial(func, *args))
+    
+    def _fetch_with_host_limit(self, source: Dict[str, Any],
+                               cutoff: datetime = None) -> Tuple[List[Dict[str, Any]], List[Callable[[], None]]]:
+        """在单主机并发上限内获取 RSS 源，返回 (文章, 待提交的状态变更)"""
+        self._pending.changes = changes = []
+        try:
+            with self._get_host_semaphore(source['url']):
+                return self.fetch_rss_feed(source, cutoff), changes
+        finally:
+            self._pending.changes = None
+    
+    def fetch_all_feeds(self, hours: int = None, deadline: float = None) -> List[Dict[str, Any]]:
+        """获取所有 RSS 源的数据，指定 hours 时只保留最近 hours 小时内发布的文章
+
+        deadline 为抓取阶段的时限（秒，默认取配置 fetch_deadline_seconds），到时直接返回已完成的源的结果，
+        未完成与熔断跳过的源记录在 self.skipped_sources 中。
+        """
         all_articles = []
+        self.prefilter_stats = {}
+        sources, broken = self.health.partition(self.config.get('sources', []))
+        self.skipped_sources = [
+            {'name': source['name'], 'url': source['url'], 'reason': '连续失败已熔断'}
+            for source in broken
+        ]
+        # 重要且历史耗时最长的源最先开始，尽量在时限内完成
+        sources = sorted(sources, key=self.health.schedule_key)
+        cutoff = self._make_cutoff(hours)
+        deadline = self.fetch_deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + deadline if deadline and deadline > 0 else None
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        
+        if self.parse_processes > 1 and len(sources) >= self.parse_pool_min_sources:
+            # 使用 spawn 启动子进程，避免在多线程环境下 fork
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            self.logger.info(f"启用解析进程池，进程数: {self.parse_processes}")
+        
+        if self.max_workers <= 1 or len(sources) <= 1:
+            for index, source in enumerate(sources):
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    break
+                results[index] = self.fetch_rss_feed(source, cutoff)
+        else:
+            workers = min(self.max_workers, len(sources))
+            self.logger.info(f"并发获取 {len(sources)} 个 RSS 源，工作线程数: {workers}")
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = {
+                executor.submit(self._fetch_with_host_limit, source, cutoff): index
+                for index, source in enumerate(sources)
+            }
+            timeout = None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+            done, _ = wait(futures, timeout=timeout)
+            for future in done:
+                articles, changes = future.result()
+                for change in changes:
+                    change()
+                results[futures[future]] = articles
+            # 到达时限：取消未开始的任务，不再等待仍在进行的请求；
+            # 这些请求的状态变更留在各自的缓冲中不会提交，下次运行照常重新抓取
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
         
-        for source in self.config.get('sources', []):
-            articles = self.fetch_rss_feed(source)
-            all_articles.extend(articles)
+        # 结果按调度顺序合并
+        for index, source in enumerate(sources):
+            if index in results:
+                all_articles.extend(results[index])
+            else:
+                self.skipped_sources.append({'name': source['name'], 'url': source['url'], 'reason': '抓取超时'})
+        if len(self.skipped_sources) > len(broken):
+            self.logger.warning(f"抓取时限已到，{len(self.skipped_sources) - len(broken)} 个源未完成，返回部分结果")
         
         # 按发布时间排序
         all_articles.sort(key=lambda x: x['published'], reverse=True)
         
+        if self.url_index is not None:
+            today = self.now().date()
+            all_articles = self.url_index.filter_new(all_articles, today)
+            self.url_index.prune(today)
+        
+        if self.article_store is not None:
+            all_articles = self.article_store.add_new(all_articles)
+            self.article_store.prune(self.now())
+        
+        self.validator_cache.save()
+        self.feed_cache.save()
+        self.health.save()
+        if self.url_index is not None:
+            self.url_index.save()
+        cache_stats = self.validator_cache.stats()
+        self.logger.info(f"HTTP 缓存命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
+        body_stats = self.feed_cache.stats()
+        self.logger.info(
+            f"正文哈希命中 {body_stats['body_hits']} 次，复用条目 {body_stats['reused_entries']} 个，"
+            f"解析新条目 {body_stats['parsed_entries']} 个"
+        )
+        if self.prefilter_stats:
+            removed = sum(stats['removed'] for stats in self.prefilter_stats.values())
+            checked = sum(stats['checked'] for stats in self.prefilter_stats.values())
+            self.logger.info(f"源级预筛选共检查 {checked} 篇，移除 {removed} 篇")
         self.logger.info(f"总共获取到 {len(all_articles)} 篇文章")
         return all_articles
     
+    def get_recent_articles(self, articles: List[Dict[str, Any]], hours: int = 24) -> List[Dict[str, Any]]:
+        """获取最近指定小时内的完整文章窗口：启用文章库时从库中查询（包含此前运行已见的文章）"""
+        if self.article_store is None:
+            return self.filter_recent_articles(articles, hours)
+        
+        recent_articles = self.article_store.query(self._make_cutoff(hours))
+        self.logger.info(f"文章库中最近 {hours} 小时内有 {len(recent_articles)} 篇文章")
+        return recent_articles
+    
     def filter_recent_articles(self, articles: List[Dict[str, Any]], hours: int = 24) -> List[Dict[str, Any]]:
         """筛选最近指定小时内的文章"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff_time = self._make_cutoff(hours)
         recent_articles = [
             article for article in articles 
             if article['published'] >= cutoff_time
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from fetch_cache import read_json_file, write_json_file
+
+class SourceHealth:
+    """RSS 源健康状态与熔断器：记录连续失败次数、最近成功时间和平均耗时，并在多次运行之间持久化"""
+
+    def __init__(self, health_file: str = "cache/source_health.json",
+                 failure_threshold: int = 3,
+                 backoff_hours: float = 24,
+                 max_backoff_hours: float = 384):
+        self.health_file = health_file
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_hours = backoff_hours
+        self.max_backoff_hours = max_backoff_hours
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._records: Dict[str, Dict[str, Any]] = read_json_file(health_file, self.logger)
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """获取源的健康记录"""
+        with self._lock:
+            return dict(self._records.get(url, {}))
+
+    def is_open(self, url: str, now: Optional[datetime] = None) -> bool:
+        """熔断器是否打开（连续失败达到阈值且未到下次探测时间）"""
+        record = self.get(url)
+        if record.get('consecutive_failures', 0) < self.failure_threshold:
+            return False
+        next_probe = record.get('next_probe')
+        if not next_probe:
+            return False
+        return (now or datetime.now()) < datetime.fromisoformat(next_probe)
+
+    def record_success(self, url: str, latency: float, now: Optional[datetime] = None) -> None:
+        """记录一次成功获取"""
+        now = now or datetime.now()
+        with self._lock:
+            record = self._records.setdefault(url, {})
+            record['consecutive_failures'] = 0
+            record['last_success'] = now.isoformat()
+            record['avg_latency'] = self._average(record.get('avg_latency'), latency)
+            record.pop('next_probe', None)
+            self._dirty = True
+
+    def record_failure(self, url: str, latency: float, now: Optional[datetime] = None) -> None:
+        """记录一次失败，达到阈值后按指数退避安排下次探测"""
+        now = now or datetime.now()
+        with self._lock:
+            record = self._records.setdefault(url, {})
+            failures = record.get('consecutive_failures', 0) + 1
+            record['consecutive_failures'] = failures
+            record['last_failure'] = now.isoformat()
+            record['avg_latency'] = self._average(record.get('avg_latency'), latency)
+            if failures >= self.failure_threshold:
+                backoff = min(self.max_backoff_hours,
+                              self.backoff_hours * 2 ** (failures - self.failure_threshold))
+                record['next_probe'] = (now + timedelta(hours=backoff)).isoformat()
+            self._dirty = True
+
+    @staticmethod
+    def _average(previous: Optional[float], latency: float, alpha: float = 0.3) -> float:
+        """指数加权平均耗时"""
+        if previous is None:
+            return round(latency, 3)
+        return round(alpha * latency + (1 - alpha) * previous, 3)
+
+    def partition(self, sources: List[Dict[str, Any]],
+                  now: Optional[datetime] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """将源分为 (可获取的源, 熔断中被跳过的源)"""
+        now = now or datetime.now()
+        runnable, skipped = [], []
+        for source in sources:
+            if self.is_open(source['url'], now):
+                record = self.get(source['url'])
+                self.logger.warning(
+                    f"跳过熔断中的源 {source['name']}：连续失败 {record.get('consecutive_failures')} 次，"
+                    f"下次探测时间 {record.get('next_probe')}"
+                )
+                skipped.append(source)
+            else:
+                runnable.append(source)
+        return runnable, skipped
+
+    def schedule_key(self, source: Dict[str, Any]) -> Tuple[bool, float, float]:
+        """调度排序键：最近失败过的源排最后；其余按重要度、历史耗时从高到低，最慢的最先开始"""
+        record = self.get(source['url'])
+        failing = record.get('consecutive_failures', 0) > 0
+        # 没有历史记录的源视为最慢，尽早开始
+        latency = record.get('avg_latency', float('inf'))
+        return failing, -float(source.get('priority', 0)), -latency
+
+    def save(self) -> None:
+        """写回健康状态文件（仅在有变化时）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._records)
+            self._dirty = False
+        write_json_file(self.health_file, data, self.logger)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from tokenizer import tokenize
+from text_normalize import match_text
+
+class _CachedText:
+    """单篇文章的规范化结果"""
+    __slots__ = ('text', 'tokens', 'counts')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: Optional[FrozenSet[str]] = None
+        self.counts: Optional[Dict[str, int]] = None
+
+class TextCache:
+    """文章文本规范化缓存：按 (标题, 摘要) 内容缓存小写文本和分词集合，LRU 淘汰
+
+    筛选、优先级排序和关键词统计共用同一份缓存，同一篇文章只做一次小写化和分词。
+    """
+
+    def __init__(self, maxsize: int = 20000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], _CachedText]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, article: Dict[str, Any]) -> _CachedText:
+        """取出（或创建）文章对应的缓存项"""
+        key = (article.get('title', ''), article.get('summary', ''))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = _CachedText(article.get('match_text') or match_text(*key))
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def text(self, article: Dict[str, Any]) -> str:
+        """小写的 "标题 摘要" 文本（抓取时已附带 match_text 的文章直接使用，不占缓存）"""
+        text = article.get('match_text')
+        if text is not None:
+            return text
+        return self._entry(article).text
+
+    def tokens(self, article: Dict[str, Any]) -> FrozenSet[str]:
+        """小写文本的分词集合（首次使用时计算）"""
+        entry = self._entry(article)
+        if entry.tokens is None:
+            entry.tokens = frozenset(self._counts(entry))
+        return entry.tokens
+
+    def term_counts(self, article: Dict[str, Any]) -> Dict[str, int]:
+        """小写文本的词频（首次使用时计算，用于相关性评分）"""
+        return self._counts(self._entry(article))
+
+    @staticmethod
+    def _counts(entry: _CachedText) -> Dict[str, int]:
+        if entry.counts is None:
+            entry.counts = dict(Counter(tokenize(entry.text)))
+        return entry.counts
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import html
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# 含真正的标签语法（<tag ...>、</tag>、<!-- ）时才交给 HTML 解析器；纯文本中的 "x<y" 等不算标签
+_TAG_RE = re.compile(r'<(?:[a-zA-Z][a-zA-Z0-9:-]*(?:\s[^<>]*)?/?>|/[a-zA-Z][a-zA-Z0-9:-]*\s*>|!--)')
+# 只含实体时直接解码，不经过 HTML 解析器
+_ENTITY_RE = re.compile(r'&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z]+\d*);')
+# 内容不参与匹配与展示的元素（连同内部文本一起删除）
+_DROP_TAGS = ('script', 'style', 'noscript', 'iframe', 'svg', 'template')
+# 块级元素之后补换行，避免相邻段落的文字粘连
+_BLOCK_TAGS = ('p', 'div', 'br', 'li', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+               'blockquote', 'pre', 'ul', 'ol', 'table', 'section', 'article', 'header', 'footer',
+               'figure', 'figcaption', 'hr', 'dd', 'dt')
+
+def collapse_whitespace(text: str) -> str:
+    """连续空白（含换行、全角空格等）合并为一个空格并去掉首尾空白"""
+    return ' '.join(text.split())
+
+def strip_html(text: str) -> str:
+    """去掉 HTML 标签、脚本与样式，解码实体，返回纯文本（未合并空白）"""
+    if not text:
+        return text
+    if not _TAG_RE.search(text):
+        return html.unescape(text) if _ENTITY_RE.search(text) else text
+    try:
+        root = lxml_html.fragment_fromstring(text, create_parent='div')
+    except (etree.ParserError, ValueError):
+        return text
+    etree.strip_elements(root, *_DROP_TAGS, with_tail=False)
+    for element in root.iter(*_BLOCK_TAGS):
+        element.tail = '\n' + (element.tail or '')
+    return root.text_content()
+
+def normalize_summary(summary: str, max_chars: int = 500) -> str:
+    """摘要规范化：去掉 HTML、合并空白、截断到 max_chars 个字符（0 表示不截断）"""
+    text = collapse_whitespace(strip_html(summary or ''))
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars].rstrip() + '…'
+    return text
+
+def match_text(title: str, summary: str) -> str:
+    """关键词匹配用的小写 "标题 摘要" 文本"""
+    return f"{title.lower()} {summary.lower()}"
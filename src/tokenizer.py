@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from typing import FrozenSet, Iterable, List, Optional
+
+import jieba_loader
+
+# 中日韩文字：假名、CJK 扩展 A、CJK 统一汉字、谚文、CJK 兼容汉字
+CJK_RE = re.compile('[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]')
+# 拉丁文字的单词字符（小写）：数字、ASCII 字母及带重音的拉丁字母
+LATIN_WORD_CHARS = '0-9a-zÀ-ɏ'
+_LATIN_TOKEN_RE = re.compile(f'[{LATIN_WORD_CHARS}]+')
+_WORD_RE = re.compile(r'[^\W_]')
+
+def has_cjk(text: str) -> bool:
+    """文本中是否含有中日韩文字"""
+    return CJK_RE.search(text) is not None
+
+def tokenize(text: str) -> List[str]:
+    """小写文本分词：含中日韩文字时交给 jieba，纯拉丁文本用正则按单词切分（不加载 jieba），均不返回空白和标点"""
+    if has_cjk(text):
+        return [token for token in jieba_loader.lcut(text) if _WORD_RE.search(token)]
+    return _LATIN_TOKEN_RE.findall(text)
+
+class KeywordSet:
+    """一组关键词的预编译匹配：拉丁文字关键词按单词边界匹配（"ai" 不会命中 "said"），含中日韩文字的关键词按子串匹配"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        latin = [keyword for keyword in self.keywords if keyword and not has_cjk(keyword)]
+        # 空关键词与任何文本都匹配（与 `'' in text` 一致）
+        self.substrings: List[str] = [keyword for keyword in self.keywords if not keyword or has_cjk(keyword)]
+        self.pattern = None
+        if latin:
+            # 长关键词优先，避免 "gpt" 抢先匹配 "gpt-4" 的前缀
+            alternation = '|'.join(re.escape(keyword) for keyword in sorted(latin, key=len, reverse=True))
+            self.pattern = re.compile(f'(?<![{LATIN_WORD_CHARS}])(?:{alternation})(?![{LATIN_WORD_CHARS}])')
+        self._tokens: Optional[FrozenSet[str]] = None
+
+    def find(self, content: str) -> Optional[str]:
+        """返回在小写文本中命中的第一个关键词，未命中返回 None"""
+        for keyword in self.substrings:
+            if keyword in content:
+                return keyword
+        if self.pattern is not None:
+            match = self.pattern.search(content)
+            if match:
+                return match.group(0)
+        return None
+
+    @property
+    def tokens(self) -> FrozenSet[str]:
+        """全部关键词的分词结果（首次使用时计算）"""
+        if self._tokens is None:
+            tokens = set()
+            for keyword in self.keywords:
+                tokens.update(tokenize(keyword))
+            self._tokens = frozenset(tokens)
+        return self._tokens
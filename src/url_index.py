@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import sys
+import base64
+import hashlib
+import logging
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Any, Dict, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from fetch_cache import read_json_file, write_json_file
+
+# 已知的跟踪参数（统计、分享来源等），不影响页面内容；ref、scene 等通用参数名在部分站点用于区分内容，予以保留
+TRACKING_PARAMS = {
+    'spm', 'fbclid', 'gclid', 'dclid', 'yclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref_src', 'share_token', 'share_source', 'share_medium', 'isappinstalled',
+    'wxshare_count', 'clicktime', 'enterid', 'sharer_shareid', 'sharer_sharetime',
+    'mkt_tok', '_hsenc', '_hsmi', 'cmpid', 'ncid'
+}
+TRACKING_PREFIXES = ('utm_', 'sharer_')
+# 移动版、AMP 版等镜像主机前缀
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'wap.', 'amp.')
+_AMP_PATH_RE = re.compile(r'(/amp/?|\.amp)(?=(\.html?)?$)')
+# 单页应用的路由锚点（#/path、#!path）标识不同页面，不能去掉
+ROUTE_FRAGMENT_PREFIXES = ('/', '!')
+
+def canonicalize_url(url: str) -> str:
+    """规范化链接：统一协议与主机、去掉移动版/AMP 变体、跟踪参数和页内锚点（保留路由锚点），剩余参数排序"""
+    url = url.strip()
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower()
+    path = parts.path
+
+    # Google AMP 缓存：xxx.cdn.ampproject.org/c/s/原站主机/路径
+    if host.endswith('.cdn.ampproject.org'):
+        match = re.match(r'/[a-z]/(?:s/)?([^/]+)(/.*)?$', path)
+        if match:
+            host, path = match.group(1).lower(), match.group(2) or ''
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    path = _AMP_PATH_RE.sub('', path).rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    # http 与 https、默认端口视为同一地址
+    port = parts.port if parts.port not in (None, 80, 443) else None
+    netloc = f"{host}:{port}" if port else host
+    fragment = parts.fragment if parts.fragment.startswith(ROUTE_FRAGMENT_PREFIXES) else ''
+    return urlunsplit(('https', netloc, path, urlencode(query), fragment))
+
+def url_hash(url: str) -> int:
+    """规范化链接的 64 位哈希"""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+class UrlIndex:
+    """跨天去重索引：最近 N 天见过的规范化链接的 64 位哈希
+
+    内存中为一个哈希集合（每篇文章 O(1) 判断），磁盘上按日期保存为有序的 64 位整数数组（base64 编码），
+    每条链接只占 8 字节。
+    """
+
+    def __init__(self, index_file: str = "cache/url_index.json", retention_days: int = 7):
+        self.index_file = index_file
+        self.retention_days = retention_days
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self._days: Dict[str, Set[int]] = {
+                day: self._decode(encoded)
+                for day, encoded in read_json_file(index_file, self.logger).items()
+            }
+        except (ValueError, TypeError) as e:
+            self.logger.warning(f"加载链接去重索引失败，将重新建立 {index_file}: {e}")
+            self._days = {}
+        self._all: Set[int] = set().union(*self._days.values()) if self._days else set()
+
+    @staticmethod
+    def _decode(encoded: str) -> Set[int]:
+        """base64 小端 64 位整数数组 -> 哈希集合"""
+        values = array('Q')
+        values.frombytes(base64.b64decode(encoded))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return set(values)
+
+    @staticmethod
+    def _encode(hashes: Set[int]) -> str:
+        """哈希集合 -> base64 小端 64 位整数有序数组"""
+        values = array('Q', sorted(hashes))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return base64.b64encode(values.tobytes()).decode('ascii')
+
+    def __contains__(self, url: str) -> bool:
+        return url_hash(url) in self._all
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def filter_new(self, articles: List[Dict[str, Any]], today: date) -> List[Dict[str, Any]]:
+        """过滤掉规范化链接此前见过（含本批次内重复）的文章，并把新链接记入当天"""
+        new_articles = []
+        day = today.isoformat()
+        with self._lock:
+            todays = self._days.setdefault(day, set())
+            for article in articles:
+                link = article.get('link', '')
+                if not link:
+                    new_articles.append(article)
+                    continue
+                h = url_hash(link)
+                if h in self._all:
+                    continue
+                self._all.add(h)
+                todays.add(h)
+                self._dirty = True
+                new_articles.append(article)
+        self.logger.info(f"链接去重：跳过已见链接 {len(articles) - len(new_articles)} 篇")
+        return new_articles
+
+    def prune(self, today: date) -> int:
+        """删除超过保留天数的记录，返回删除的天数"""
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        with self._lock:
+            expired = [day for day in self._days if day < cutoff]
+            for day in expired:
+                del self._days[day]
+            if expired:
+                self._all = set().union(*self._days.values()) if self._days else set()
+                self._dirty = True
+        return len(expired)
+
+    def save(self) -> None:
+        """写回索引文件（仅在有变化时）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {day: self._encode(hashes) for day, hashes in sorted(self._days.items())}
+            self._dirty = False
+        write_json_file(self.index_file, data, self.logger)
@@ -1,8 +1,163 @@
 import os
-from typing import List, Dict
+import re
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Set, Tuple
+from keyword_matcher import KeywordMatcher
+from tokenizer import LATIN_WORD_CHARS
+
+GROUP_FIELDS = ('must_keywords', 'exclude_keywords', 'keywords')
+
+def parse_term(raw: str) -> Tuple[str, str]:
+    """解析关键词条目为 (类型, 规范化文本)：/正则/ 为正则，=词 为整词匹配，其余为子串（统一小写）"""
+    if len(raw) >= 2 and raw.startswith('/') and raw.endswith('/'):
+        return 'regex', raw[1:-1]
+    if raw.startswith('='):
+        return 'word', raw[1:].strip().lower()
+    return 'substring', raw.lower()
+
+@lru_cache(maxsize=4096)
+def compile_term(raw: str) -> Callable[[str], bool]:
+    """将关键词条目编译为 "小写文本 -> 是否命中" 的判断函数（每个条目只编译一次）"""
+    kind, text = parse_term(raw)
+    if kind == 'substring':
+        return lambda content: text in content
+    if kind == 'word':
+        pattern = re.compile(f'(?<![{LATIN_WORD_CHARS}]){re.escape(text)}(?![{LATIN_WORD_CHARS}])')
+    else:
+        try:
+            pattern = re.compile(text, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式 {raw}: {e}")
+    return lambda content: pattern.search(content) is not None
+
+def _entry(kind: str, text: str) -> str:
+    """(类型, 规范化文本) 还原为条目写法"""
+    if kind == 'regex':
+        return f"/{text}/"
+    if kind == 'word':
+        return f"={text}"
+    return text
+
+class GroupRule(Mapping):
+    """编译后的单个分组（只读）：可以像原来的分组 dict 一样读取配置，并带有预编译的关键词编号"""
+    __slots__ = ('_config', 'must', 'exclude', 'any_of', 'label')
+
+    def __init__(self, config: Dict[str, Tuple[str, ...]],
+                 must: FrozenSet[int], exclude: FrozenSet[int], any_of: FrozenSet[int]):
+        object.__setattr__(self, '_config', config)
+        object.__setattr__(self, 'must', must)
+        object.__setattr__(self, 'exclude', exclude)
+        object.__setattr__(self, 'any_of', any_of)
+        # 分组描述：普通词、+必须词、!排除词
+        label = list(config['keywords'])
+        label += [f"+{w}" for w in config['must_keywords']]
+        label += [f"!{w}" for w in config['exclude_keywords']]
+        object.__setattr__(self, 'label', '、'.join(label))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GroupRule 是只读对象")
+
+    def __getitem__(self, field: str) -> Tuple[str, ...]:
+        return self._config[field]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._config)
+
+    def __len__(self) -> int:
+        return len(self._config)
+
+    def __repr__(self) -> str:
+        return f"GroupRule({self.label})"
+
+class RuleSet:
+    """不可变的编译后分组规则集
+
+    关键词统一小写并去重；子串条目编入一个 Aho-Corasick 匹配器，整词与正则条目各自预编译一次。
+    提供 keywords / keyword_id / find，可直接作为 KeywordIndex 的匹配器使用。
+    """
+    __slots__ = ('groups', 'terms', 'keywords', 'digest', '_ids', '_matcher', '_substring_ids', '_patterns')
+
+    def __init__(self, groups: Iterable[Mapping[str, Iterable[str]]], digest: str = ''):
+        terms: List[Tuple[str, str]] = []
+        ids: Dict[Tuple[str, str], int] = {}
+        rules = []
+        for group in groups:
+            config = {field: tuple(group.get(field, [])) for field in GROUP_FIELDS}
+            term_ids = []
+            for field in GROUP_FIELDS:
+                field_ids = set()
+                for raw in config[field]:
+                    term = parse_term(raw)
+                    if term not in ids:
+                        ids[term] = len(terms)
+                        terms.append(term)
+                    field_ids.add(ids[term])
+                term_ids.append(frozenset(field_ids))
+            rules.append(GroupRule(config, *term_ids))
+
+        matcher = KeywordMatcher(text for kind, text in terms if kind == 'substring')
+        patterns = []
+        for term_id, (kind, text) in enumerate(terms):
+            if kind != 'substring':
+                patterns.append((term_id, compile_term(_entry(kind, text))))
+
+        setattr_ = object.__setattr__
+        setattr_(self, 'groups', tuple(rules))
+        setattr_(self, 'terms', tuple(terms))
+        setattr_(self, 'keywords', tuple(text for kind, text in terms))
+        setattr_(self, 'digest', digest)
+        setattr_(self, '_ids', ids)
+        setattr_(self, '_matcher', matcher)
+        setattr_(self, '_substring_ids', tuple(ids[('substring', kw)] for kw in matcher.keywords))
+        setattr_(self, '_patterns', tuple(patterns))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSet 是只读对象")
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self) -> Iterator[GroupRule]:
+        return iter(self.groups)
+
+    def keyword_id(self, raw: str) -> int:
+        """关键词条目编号"""
+        return self._ids[parse_term(raw)]
+
+    def entry(self, term_id: int) -> str:
+        """关键词条目的规范写法（子串为小写关键词，整词带 = 前缀，正则带 / 包围），用于统计展示"""
+        return _entry(*self.terms[term_id])
+
+    def entries(self) -> List[str]:
+        """全部关键词条目的规范写法（按编号顺序）"""
+        return [_entry(kind, text) for kind, text in self.terms]
+
+    def find(self, text: str) -> Set[int]:
+        """扫描小写文本，返回命中的关键词条目编号集合"""
+        substring_ids = self._substring_ids
+        hits = {substring_ids[keyword_id] for keyword_id in self._matcher.find(text)}
+        for term_id, matches in self._patterns:
+            if matches(text):
+                hits.add(term_id)
+        return hits
+
+    def query_keywords(self, rule: GroupRule) -> List[str]:
+        """分组的正向关键词（必须词与普通词，不含正则），用作相关性排序的查询"""
+        return [self.terms[term_id][1] for term_id in sorted(rule.must | rule.any_of)
+                if self.terms[term_id][0] != 'regex']
+
+    def literal_keywords(self) -> List[str]:
+        """子串与整词条目的关键词（不含正则），用于登记 jieba 用户词典等"""
+        return [text for kind, text in self.terms if kind != 'regex']
+
+# 编译结果缓存：绝对路径 -> (修改时间, 内容哈希, 规则集)
+_compiled_cache: Dict[str, Tuple[int, str, RuleSet]] = {}
+_cache_lock = threading.Lock()
 
 class WordGroupParser:
-    """解析 frequency_words.txt 分组配置，支持普通词、+必须词、!排除词"""
+    """解析 frequency_words.txt 分组配置，支持普通词、+必须词、!排除词，以及 /正则/ 和 =整词 条目"""
     def __init__(self, filepath: str = None):
         if filepath is None:
             # 默认在项目根目录
@@ -10,30 +165,55 @@ class WordGroupParser:
         self.filepath = filepath
 
     def parse(self) -> List[Dict[str, List[str]]]:
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            return self._parse_lines(f)
+
+    @staticmethod
+    def _parse_lines(lines: Iterable[str]) -> List[Dict[str, List[str]]]:
         groups = []
         current_group = {"keywords": [], "must_keywords": [], "exclude_keywords": []}
-        with open(self.filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    # 空行表示新分组
-                    if any(current_group.values()):
-                        groups.append(current_group)
-                        current_group = {"keywords": [], "must_keywords": [], "exclude_keywords": []}
-                    continue
-                if line.startswith('+'):
-                    current_group["must_keywords"].append(line[1:].strip())
-                elif line.startswith('!'):
-                    current_group["exclude_keywords"].append(line[1:].strip())
-                else:
-                    current_group["keywords"].append(line)
+        for line in lines:
+            line = line.strip()
+            if not line:
+                # 空行表示新分组
+                if any(current_group.values()):
+                    groups.append(current_group)
+                    current_group = {"keywords": [], "must_keywords": [], "exclude_keywords": []}
+                continue
+            if line.startswith('+'):
+                current_group["must_keywords"].append(line[1:].strip())
+            elif line.startswith('!'):
+                current_group["exclude_keywords"].append(line[1:].strip())
+            else:
+                current_group["keywords"].append(line)
         # 最后一个分组
         if any(current_group.values()):
             groups.append(current_group)
         return groups
 
+    def compile(self) -> RuleSet:
+        """读取并编译分组配置；按 (路径, 修改时间, 内容哈希) 缓存，文件未变化时直接复用同一个规则集"""
+        path = os.path.abspath(self.filepath)
+        mtime = os.stat(path).st_mtime_ns
+        with _cache_lock:
+            cached = _compiled_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[2]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()[:16]
+        if cached and cached[1] == digest:
+            # 仅修改时间变化（如被重新检出），内容未变
+            rules = cached[2]
+        else:
+            rules = RuleSet(self._parse_lines(data.decode('utf-8').splitlines()), digest)
+        with _cache_lock:
+            _compiled_cache[path] = (mtime, digest, rules)
+        return rules
+
 if __name__ == "__main__":
     parser = WordGroupParser()
     groups = parser.parse()
     for idx, group in enumerate(groups, 1):
-        print(f"分组{idx}：{group}") 
\ No newline at end of file
+        print(f"分组{idx}：{group}")
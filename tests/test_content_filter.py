@@ -5,15 +5,28 @@ import unittest
 from datetime import datetime
 import sys
 import os
+import subprocess
+import tempfile
 
 # 添加 src 目录到路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from content_filter import ContentFilter
+from keyword_matcher import KeywordMatcher
+from keyword_index import KeywordIndex
+from text_cache import TextCache
+from tokenizer import KeywordSet, tokenize
+import jieba_loader
+from word_group_parser import WordGroupParser, RuleSet
+from relevance import BM25Ranker
 
 class TestContentFilter(unittest.TestCase):
     
     def setUp(self):
+        # jieba 前缀词典缓存写到临时目录，不在工作目录留下 cache/jieba.cache
+        jieba_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(jieba_dir.cleanup)
+        jieba_loader.set_cache_dir(jieba_dir.name)
         self.filter = ContentFilter()
         
         # 测试文章数据
@@ -121,5 +134,226 @@ class TestContentFilter(unittest.TestCase):
         self.assertEqual(len(filtered), 1)
         self.assertEqual(filtered[0]['title'], '新文章')
 
+    def test_keyword_matcher_overlapping(self):
+        """测试多模式匹配器处理重叠与嵌套关键词"""
+        matcher = KeywordMatcher(['he', 'She', 'his', 'hers', '人工智能', '智能'])
+        
+        self.assertEqual(matcher.find_keywords('ushers'), {'he', 'she', 'hers'})
+        self.assertEqual(matcher.find_keywords('通用人工智能'), {'人工智能', '智能'})
+        self.assertEqual(matcher.find_keywords('无关内容'), set())
+    
+    def test_keyword_index_set_algebra(self):
+        """测试倒排索引的交、并、差运算"""
+        matcher = KeywordMatcher(['ai', '芯片', '广告'])
+        index = KeywordIndex(matcher, ['ai 芯片', 'ai 广告', '芯片', 'ai'])
+        ai, chip, ad = (matcher.keyword_id(k) for k in ('ai', '芯片', '广告'))
+        
+        self.assertEqual(list(index.doc_ids(index.posting('AI'))), [0, 1, 3])
+        self.assertEqual(list(index.doc_ids(index.evaluate([ai], [ad], []))), [0, 3])
+        self.assertEqual(list(index.doc_ids(index.evaluate([], [], [chip, ad]))), [0, 1, 2])
+        self.assertEqual(index.count(index.evaluate([], [ad], [])), 3)
+    
+    def test_filter_by_groups_matches_match_group(self):
+        """测试编译后的分组匹配与逐组子串匹配结果一致"""
+        groups = [
+            {'keywords': ['AI', '人工智能'], 'must_keywords': [], 'exclude_keywords': ['广告']},
+            {'keywords': ['ChatGPT'], 'must_keywords': ['发布'], 'exclude_keywords': []},
+            {'keywords': [], 'must_keywords': ['新闻'], 'exclude_keywords': []},
+            {'keywords': ['突破', '内容'], 'must_keywords': [], 'exclude_keywords': ['推广']}
+        ]
+        
+        results = self.filter.filter_by_groups(self.test_articles, groups)
+        
+        for result, group in zip(results, groups):
+            expected = [a for a in self.test_articles if self.filter._match_group(a, group)]
+            self.assertEqual(result['matched_articles'], expected)
+        self.assertEqual([len(r['matched_articles']) for r in results], [2, 1, 0, 1])
+
+    def test_filter_by_groups_batch(self):
+        """测试 numpy 批量模式与倒排索引结果一致，并给出按来源统计"""
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest('未安装 numpy')
+        
+        groups = [
+            {'keywords': ['AI', '人工智能'], 'must_keywords': [], 'exclude_keywords': ['广告']},
+            {'keywords': [], 'must_keywords': ['发布'], 'exclude_keywords': []},
+            {'keywords': ['不存在的词'], 'must_keywords': [], 'exclude_keywords': []}
+        ]
+        
+        expected = self.filter.filter_by_groups(self.test_articles, groups)
+        batch = self.filter.filter_by_groups_batch(self.test_articles, groups)
+        
+        for got, want in zip(batch, expected):
+            self.assertEqual(got['matched_articles'], want['matched_articles'])
+            self.assertEqual(got['count'], len(want['matched_articles']))
+        self.assertEqual(batch[0]['source_counts'], {'科技新闻': 1, 'AI 新闻': 1})
+        self.assertEqual(batch[2]['source_counts'], {})
+    
+    def test_text_cache_shared_and_bounded(self):
+        """测试文本缓存：同一内容只规范化一次，超出容量时淘汰最久未用的条目"""
+        cache = TextCache(maxsize=3)
+        shared = ContentFilter(cache)
+        config = {'keywords': ['人工智能'], 'exclude_keywords': []}
+        
+        shared.filter_articles(self.test_articles, config)
+        self.assertEqual(cache.misses, 3)
+        shared.sort_by_priority(self.test_articles, ['AI'])
+        self.assertEqual(cache.misses, 3)
+        
+        cache.maxsize = 2
+        cache.text({'title': '新文章', 'summary': ''})
+        self.assertEqual(len(cache), 2)
+        cache.text(self.test_articles[0])  # 最久未用的第一篇已被淘汰
+        self.assertEqual(cache.misses, 5)
+        
+        article = self.test_articles[1]
+        self.assertEqual(cache.text(article), f"{article['title'].lower()} {article['summary'].lower()}")
+        self.assertIs(cache.tokens(article), cache.tokens(dict(article)))
+    
+    def test_keyword_paths_do_not_load_jieba(self):
+        """测试纯子串匹配的路径（分组筛选、优先级排序）不会加载 jieba"""
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {src_dir!r})\n"
+            "from content_filter import ContentFilter\n"
+            "f = ContentFilter()\n"
+            "articles = [{'title': 'AI 新闻', 'summary': '人工智能'}]\n"
+            "f.filter_by_groups(articles, [{'keywords': ['ai'], 'must_keywords': [], 'exclude_keywords': []}])\n"
+            "f._match_group(articles[0], {'keywords': ['ai'], 'must_keywords': [], 'exclude_keywords': []})\n"
+            "f.sort_by_priority(articles, ['AI'])\n"
+            "print('jieba' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+    
+    def test_jieba_cache_dir_defaults_to_project_root(self):
+        """测试 jieba 缓存目录默认为项目根目录下的 cache/，与当前工作目录无关"""
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {src_dir!r})\n"
+            "import jieba_loader\n"
+            "print(jieba_loader._cache_dir)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                check=True, cwd=src_dir)
+        project_root = os.path.dirname(os.path.abspath(src_dir))
+        self.assertEqual(result.stdout.strip(), os.path.join(project_root, 'cache'))
+    
+    def test_latin_keywords_match_whole_words(self):
+        """测试拉丁文字关键词按单词边界匹配，中文关键词仍按子串匹配"""
+        keyword_set = KeywordSet(['AI', 'GPT', 'GPT-4', '人工智能'])
+        self.assertIsNone(keyword_set.find('the maid said hello'))
+        self.assertEqual(keyword_set.find('ai技术突破'), 'ai')
+        self.assertEqual(keyword_set.find('openai 发布 gpt-4 模型'), 'gpt-4')
+        self.assertEqual(keyword_set.find('通用人工智能'), '人工智能')
+        
+        articles = [
+            {'title': 'The maid said hello', 'summary': ''},
+            {'title': 'AI weekly', 'summary': ''}
+        ]
+        filtered = self.filter.filter_articles(articles, {'keywords': ['AI'], 'exclude_keywords': []})
+        self.assertEqual([article['title'] for article in filtered], ['AI weekly'])
+    
+    def test_tokenize_routes_by_script(self):
+        """测试分词路由：纯拉丁文本按单词切分，中文文本交给 jieba，均去掉空白和标点"""
+        self.assertEqual(tokenize('chatgpt, the new model!'), ['chatgpt', 'the', 'new', 'model'])
+        tokens = tokenize('人工智能 取得 进展')
+        self.assertIn('人工智能', tokens)
+        self.assertNotIn(' ', tokens)
+    
+    def test_user_dict_keeps_keywords_whole(self):
+        """测试分组关键词登记为 jieba 用户词典后切分为单个词，词典按键缓存到磁盘
+
+        在子进程中运行，登记的词不会留在本进程的全局 jieba 词典中影响其他测试。
+        """
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            script = (
+                "import sys\n"
+                f"sys.path.insert(0, {src_dir!r})\n"
+                "import jieba_loader\n"
+                "from tokenizer import tokenize\n"
+                f"jieba_loader.set_cache_dir({cache_dir!r})\n"
+                "jieba_loader.register_keywords(['具身智能', 'AI', 'machine learning'], 'test-key')\n"
+                "print('具身智能' in tokenize('具身智能机器人'))\n"
+                "print(jieba_loader.user_dict_path('test-key'))\n"
+            )
+            result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+            in_tokens, path = result.stdout.split()
+            self.assertEqual(in_tokens, 'True')
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual([line.split()[0] for line in f], ['具身智能'])
+    
+    def test_compiled_rules_regex_and_word_entries(self):
+        """测试分组配置的 /正则/ 与 =整词 条目，以及编译结果按修改时间和内容哈希缓存"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'frequency_words.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("=AI\n!广告\n\n/chatgpt|gpt-\\d/\n+发布\n")
+            parser = WordGroupParser(path)
+            rules = parser.compile()
+            self.assertIs(WordGroupParser(path).compile(), rules)
+            
+            articles = self.test_articles + [{'title': 'The maid said', 'summary': '', 'source': 'x'}]
+            results = self.filter.filter_by_groups(articles, rules)
+            self.assertEqual([a['title'] for a in results[0]['matched_articles']], ['AI 技术最新突破'])
+            self.assertEqual([a['title'] for a in results[1]['matched_articles']], ['ChatGPT 新功能发布'])
+            self.assertEqual(results[1]['group'].label, '/chatgpt|gpt-\\d/、+发布')
+            for result in results:
+                expected = [a for a in articles if self.filter._match_group(a, result['group'])]
+                self.assertEqual(result['matched_articles'], expected)
+            with self.assertRaises(AttributeError):
+                rules.groups = ()
+            
+            # 内容不变只更新修改时间：复用；内容变化：重新编译
+            os.utime(path, ns=(0, 0))
+            self.assertIs(parser.compile(), rules)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n芯片\n")
+            self.assertEqual(len(parser.compile()), 3)
+        
+        with self.assertRaises(ValueError):
+            RuleSet([{'keywords': ['/(/']}])
+    
+    def test_remove_near_duplicates(self):
+        """测试近似重复合并：标题略有改动的转载稿只保留首次出现的一条"""
+        articles = [
+            {'title': 'OpenAI 发布 GPT-5，性能大幅提升', 'summary': '新一代大模型推理能力显著增强', 'link': 'https://a/1'},
+            {'title': 'OpenAI正式发布GPT-5：性能大幅提升', 'summary': '新一代大模型推理能力显著增强', 'link': 'https://b/2'},
+            {'title': '苹果发布 iPhone 17', 'summary': '秋季发布会', 'link': 'https://a/3'}
+        ]
+        
+        self.assertEqual(len(self.filter.remove_duplicates(articles)), 3)
+        unique = self.filter.remove_duplicates(articles, near_duplicates=True)
+        self.assertEqual([a['link'] for a in unique], ['https://a/1', 'https://a/3'])
+    
+    def test_rank_by_relevance(self):
+        """测试 BM25 相关性排序：词频高、文档短的文章靠前，top_k 只返回前 k 篇"""
+        articles = [
+            {'title': '芯片 行业 动态', 'summary': '多家 厂商 发布 新品 以及 其他 消息'},
+            {'title': 'AI 芯片', 'summary': 'AI 推理 芯片'},
+            {'title': '天气预报', 'summary': '明日 多云'},
+            {'title': 'AI 周报', 'summary': ''}
+        ]
+        
+        ranked = self.filter.rank_by_relevance(articles, ['AI', '芯片'])
+        self.assertEqual([a['title'] for a in ranked], ['AI 芯片', 'AI 周报', '芯片 行业 动态', '天气预报'])
+        top = self.filter.rank_by_relevance(articles, ['AI', '芯片'], top_k=2)
+        self.assertEqual([a['title'] for a in top], ['AI 芯片', 'AI 周报'])
+        
+        groups = [{'keywords': ['芯片'], 'must_keywords': [], 'exclude_keywords': []}]
+        ranker = BM25Ranker.from_documents(self.filter.text_cache.term_counts(a) for a in articles)
+        result = self.filter.filter_by_groups(articles, groups, ranker)[0]
+        self.assertEqual([a['title'] for a in result['matched_articles']], ['AI 芯片', '芯片 行业 动态'])
+        self.assertGreater(result['scores'][0], result['scores'][1])
+        top = self.filter.filter_by_groups(articles, groups, ranker, top_k=1)[0]
+        self.assertEqual([a['title'] for a in top['matched_articles']], ['AI 芯片'])
+        self.assertEqual(top['scores'], result['scores'][:1])
+        self.assertEqual(top['count'], 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import tempfile
+from datetime import datetime, timedelta
+import sys
+import os
+
+# 添加 src 目录到路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from daily_generator import DailyGenerator
+from keyword_trends import KeywordTrends
+from word_group_parser import RuleSet
+import jieba_loader
+
+class TestDailyGenerator(unittest.TestCase):
+    """日报生成模块测试"""
+    
+    def setUp(self):
+        # jieba 前缀词典缓存写到临时目录，不在工作目录留下 cache/jieba.cache
+        jieba_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(jieba_dir.cleanup)
+        jieba_loader.set_cache_dir(jieba_dir.name)
+        self.generator = DailyGenerator()
+        summary = 'OpenAI 今日正式发布新一代大模型 GPT-5，推理能力显著增强'
+        self.articles = [
+            {'title': 'OpenAI 发布 GPT-5，性能大幅提升', 'summary': summary,
+             'source': '36氪', 'published': datetime(2026, 10, 17, 9, 30)},
+            {'title': 'OpenAI正式发布GPT-5：性能大幅提升', 'summary': summary + '。',
+             'source': '虎嗅', 'published': datetime(2026, 10, 17, 8, 5)},
+            {'title': '重磅！OpenAI 发布 GPT-5', 'summary': summary + '，价格下降',
+             'source': '爱范儿', 'published': datetime(2026, 10, 17, 10, 40)},
+            {'title': '苹果发布 iPhone 17', 'summary': '苹果公司在秋季发布会上推出 iPhone 17 系列',
+             'source': '36氪', 'published': datetime(2026, 10, 17, 11, 0)}
+        ]
+    
+    def test_trendar_report_merges_near_duplicate_stories(self):
+        """测试分组报告把不同来源转载的同一报道合并为一条，并给出来源数"""
+        group = {'keywords': ['发布'], 'must_keywords': [], 'exclude_keywords': []}
+        text = self.generator.generate_trendar_style_report([
+            {'group': group, 'matched_articles': self.articles}
+        ])
+        lines = text.splitlines()
+        
+        self.assertEqual(lines[0], '🔥 发布 : 4 条')
+        self.assertEqual(
+            lines[2],
+            '  1. [虎嗅 等3个来源] OpenAI正式发布GPT-5：性能大幅提升 - 08:05 ~ 10:40 (3次)'
+        )
+        self.assertEqual(lines[3], '  2. [36氪] 苹果发布 iPhone 17 - 11:00 ')
+        
+        # 组内只列出前若干篇时，标题中的条数仍为命中总数
+        text = self.generator.generate_trendar_style_report([
+            {'group': group, 'matched_articles': self.articles[:1], 'count': 4}
+        ])
+        self.assertEqual(text.splitlines()[0], '🔥 发布 : 4 条')
+    
+    def test_analyze_keywords_uses_group_rules(self):
+        """测试热门关键词统计使用分组配置中的关键词条目"""
+        rules = RuleSet([{'keywords': ['OpenAI', '=iphone'], 'must_keywords': [], 'exclude_keywords': ['广告']}])
+        generator = DailyGenerator(rules=rules)
+        self.assertEqual(generator._analyze_keywords(self.articles), {'openai': 3, '=iphone': 1})
+    
+    def test_keyword_trends_spike_detection(self):
+        """测试关键词趋势：按小时累计命中，近期命中数明显高于基线时判定为突增，并可保存后恢复"""
+        rules = RuleSet([{'keywords': ['芯片', '发布'], 'must_keywords': [], 'exclude_keywords': []}])
+        now = datetime(2026, 10, 17, 12, 0)
+        # 基线：过去 10 天每天一篇"发布"，最近 24 小时"发布"一篇、"芯片"六篇
+        articles = [{'title': '新品发布', 'summary': '', 'published': now - timedelta(days=day)}
+                    for day in range(1, 11)]
+        articles += [{'title': '芯片 新闻', 'summary': '', 'published': now - timedelta(hours=hour)}
+                     for hour in range(6)]
+        articles.append({'title': '发布会', 'summary': '', 'published': now})
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'keyword_trends.json')
+            trends = KeywordTrends(path, horizon_days=30)
+            self.assertEqual(trends.update(articles, rules, self.generator.text_cache.text, now), 17)
+            self.assertEqual(trends.counts('发布', now, 24), 1)
+            self.assertEqual(trends.counts('发布', now, 24 * 30), 11)
+            spikes = trends.spikes(rules.entries(), now)
+            self.assertEqual([spike['keyword'] for spike in spikes], ['芯片'])
+            self.assertEqual(spikes[0]['count'], 6)
+            
+            trends.save(now)
+            restored = KeywordTrends(path, horizon_days=30)
+            self.assertEqual(restored.spikes(rules.entries(), now), spikes)
+            # 超过跨度的命中不再计入
+            later = now + timedelta(days=31)
+            self.assertEqual(restored.counts('芯片', later, 24 * 30), 0)
+        
+        text = self.generator.format_keyword_spikes(spikes)
+        self.assertIn('芯片：6 篇', text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+import tempfile
 from unittest.mock import patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import sys
 import os
 
@@ -11,10 +13,23 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from rss_fetcher import RSSFetcher
+from host_scheduler import HostScheduler, parse_retry_after
+from fetch_cache import ValidatorCache, FeedBodyCache
+from article_store import ArticleStore
+from source_health import SourceHealth
+from url_index import UrlIndex, canonicalize_url
+import article as article_module
+from article import Article
+from text_normalize import normalize_summary
+import jieba_loader
 
 class TestRSSFetcher(unittest.TestCase):
     
     def setUp(self):
+        # jieba 前缀词典缓存写到临时目录，不在工作目录留下 cache/jieba.cache
+        jieba_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(jieba_dir.cleanup)
+        jieba_loader.set_cache_dir(jieba_dir.name)
         self.fetcher = RSSFetcher()
     
     def test_load_config(self):
@@ -64,17 +79,586 @@ class TestRSSFetcher(unittest.TestCase):
             self.assertIn('published', article)
             self.assertIn('source', article)
     
+    def test_fetch_all_feeds_concurrent(self):
+        """测试并发获取保持按发布时间排序并限制单主机并发"""
+        import threading
+        import time
+        
+        self.fetcher.config = {
+            'sources': [
+                {'name': f'源{i}', 'url': f'https://host{i % 2}.example.com/feed{i}'}
+                for i in range(6)
+            ],
+            'global_settings': {}
+        }
+        self.fetcher.max_workers = 6
+        self.fetcher.per_host_concurrency = 1
+        self.fetcher.article_store = None
+        
+        lock = threading.Lock()
+        active = {}
+        peak = {}
+        
+        def fake_fetch(source, cutoff=None):
+            host = source['url'].split('/')[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            index = int(source['name'][1:])
+            return [{'title': source['name'], 'published': datetime(2024, 1, 1, index)}]
+        
+        with patch.object(self.fetcher, 'fetch_rss_feed', side_effect=fake_fetch):
+            articles = self.fetcher.fetch_all_feeds()
+        
+        self.assertEqual([a['title'] for a in articles], [f'源{i}' for i in range(5, -1, -1)])
+        self.assertEqual(max(peak.values()), 1)
+    
+    def test_fetch_all_feeds_deadline_returns_partial(self):
+        """测试到达抓取时限时返回已完成的结果并记录未完成的源"""
+        import time
+        
+        self.fetcher.config = {
+            'sources': [
+                {'name': '慢源', 'url': 'https://slow.example.com/feed'},
+                {'name': '快源', 'url': 'https://fast.example.com/feed'}
+            ],
+            'global_settings': {}
+        }
+        self.fetcher.max_workers = 2
+        self.fetcher.article_store = None
+        
+        def fake_fetch(source, cutoff=None):
+            if source['name'] == '慢源':
+                time.sleep(0.5)
+            return [{'title': source['name'], 'published': datetime(2024, 1, 1)}]
+        
+        with patch.object(self.fetcher, 'fetch_rss_feed', side_effect=fake_fetch):
+            articles = self.fetcher.fetch_all_feeds(deadline=0.1)
+        
+        self.assertEqual([a['title'] for a in articles], ['快源'])
+        self.assertEqual([s['name'] for s in self.fetcher.skipped_sources], ['慢源'])
+    
+    @patch('requests.Session.get')
+    def test_deadline_discards_state_of_unfinished_sources(self, mock_get):
+        """测试到达抓取时限后仍在进行的源不提交验证器、正文缓存和健康状态，下次运行照常重新抓取"""
+        import tempfile
+        import time
+        
+        body = ('<rss version="2.0"><channel><item><title>文章</title><link>https://example.com/a</link>'
+                '</item></channel></rss>').encode('utf-8')
+        
+        def fake_get(url, **kwargs):
+            if 'slow' in url:
+                time.sleep(0.4)
+            return MagicMock(status_code=200, headers={'ETag': '"v1"'}, content=body)
+        mock_get.side_effect = fake_get
+        
+        slow, fast = 'https://slow.example.com/feed', 'https://fast.example.com/feed'
+        self.fetcher.config = {
+            'sources': [{'name': '慢源', 'url': slow}, {'name': '快源', 'url': fast}],
+            'global_settings': {}
+        }
+        self.fetcher.max_workers = 2
+        self.fetcher.article_store = None
+        self.fetcher.url_index = None
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.fetcher.validator_cache = ValidatorCache(os.path.join(tmp_dir, 'http_cache.json'))
+            self.fetcher.feed_cache = FeedBodyCache(os.path.join(tmp_dir, 'feed_cache.json'))
+            self.fetcher.health = SourceHealth(os.path.join(tmp_dir, 'source_health.json'))
+            
+            articles = self.fetcher.fetch_all_feeds(deadline=0.1)
+            time.sleep(0.6)
+            
+            self.assertEqual([a['link'] for a in articles], ['https://example.com/a'])
+            self.assertEqual(self.fetcher.validator_cache.request_headers(fast), {'If-None-Match': '"v1"'})
+            self.assertIsNotNone(self.fetcher.feed_cache.body_hash(fast))
+            self.assertEqual(self.fetcher.health.get(fast)['consecutive_failures'], 0)
+            self.assertEqual(self.fetcher.validator_cache.request_headers(slow), {})
+            self.assertIsNone(self.fetcher.feed_cache.body_hash(slow))
+            self.assertEqual(self.fetcher.health.get(slow), {})
+    
+    @patch('requests.Session.get')
+    def test_cancelled_parse_not_recorded_as_failure(self, mock_get):
+        """测试抓取时限到达时被取消的解析任务不计为源的失败"""
+        import tempfile
+        from concurrent.futures import CancelledError
+        
+        mock_get.return_value = MagicMock(status_code=200, headers={}, content=b'<rss></rss>')
+        source = {'name': '测试源', 'url': 'https://cancelled.example.com/feed'}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.fetcher.health = SourceHealth(os.path.join(tmp_dir, 'source_health.json'))
+            with patch.object(self.fetcher, '_parse_with_hash_cache', side_effect=CancelledError()):
+                self.assertEqual(self.fetcher.fetch_rss_feed(source), [])
+            self.assertEqual(self.fetcher.health.get(source['url']), {})
+    
+    def test_host_scheduler_only_delays_same_host(self):
+        """测试令牌桶只对同一主机的请求延迟"""
+        clock = [0.0]
+        sleeps = []
+        
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+        
+        scheduler = HostScheduler(rate=0.5, burst=1, clock=lambda: clock[0], sleep=fake_sleep)
+        self.assertEqual(scheduler.acquire('https://a.example.com/feed'), 0)
+        self.assertEqual(scheduler.acquire('https://b.example.com/feed'), 0)
+        self.assertAlmostEqual(scheduler.acquire('https://a.example.com/other'), 2.0)
+        
+        scheduler.penalize('https://b.example.com/feed', 10)
+        self.assertAlmostEqual(scheduler.acquire('https://b.example.com/feed'), 10.0)
+    
+    def test_host_penalty_keeps_source_rate(self):
+        """测试 429 暂停不会把源级的宽松速率收紧为默认值"""
+        clock = [0.0]
+        scheduler = HostScheduler(rate=0.5, burst=1, clock=lambda: clock[0], sleep=lambda s: None)
+        scheduler.acquire('https://fast.example.com/feed', rate=5.0, burst=5)
+        scheduler.penalize('https://fast.example.com/feed', 10)
+        bucket = scheduler._buckets['fast.example.com']
+        self.assertEqual((bucket.rate, bucket.capacity), (5.0, 5.0))
+    
+    def test_parse_retry_after(self):
+        """测试 Retry-After 解析"""
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+    
+    @patch('requests.Session.get')
+    def test_fetch_retries_after_429(self, mock_get):
+        """测试 429 响应遵循 Retry-After 后重试"""
+        limited = MagicMock(status_code=429, headers={'Retry-After': '0'})
+        ok = MagicMock(status_code=200, headers={})
+        mock_get.side_effect = [limited, ok]
+        
+        response = self.fetcher._request({'name': '测试源', 'url': 'https://retry.example.com/feed'})
+        
+        self.assertIs(response, ok)
+        self.assertEqual(mock_get.call_count, 2)
+    
+    def test_validator_cache_persists(self):
+        """测试 ETag / Last-Modified 缓存在多次运行之间保留"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_file = os.path.join(tmp_dir, 'http_cache.json')
+            cache = ValidatorCache(cache_file)
+            self.assertEqual(cache.request_headers('https://example.com/feed'), {})
+            cache.update('https://example.com/feed', {'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2024 12:00:00 GMT'})
+            cache.save()
+            
+            reloaded = ValidatorCache(cache_file)
+            self.assertEqual(reloaded.request_headers('https://example.com/feed'), {
+                'If-None-Match': '"abc"',
+                'If-Modified-Since': 'Mon, 01 Jan 2024 12:00:00 GMT'
+            })
+    
+    @patch('feed_stream.feedparser.parse')
+    @patch('requests.Session.get')
+    def test_fetch_not_modified_skips_parse(self, mock_get, mock_parse):
+        """测试 304 响应跳过 feedparser"""
+        mock_get.return_value = MagicMock(status_code=304, headers={})
+        hits = self.fetcher.validator_cache.hits
+        
+        articles = self.fetcher.fetch_rss_feed({'name': '测试源', 'url': 'https://cached.example.com/feed'})
+        
+        self.assertEqual(articles, [])
+        mock_parse.assert_not_called()
+        self.assertEqual(self.fetcher.validator_cache.hits, hits + 1)
+    
+    @patch('requests.Session.get')
+    def test_not_modified_reuses_cached_articles(self, mock_get):
+        """测试 304 时复用上次的解析结果（按时间窗口过滤），解析失败时不保存新的验证器"""
+        import tempfile
+        
+        now = self.fetcher.now()
+        items = ''.join(
+            f'<item><title>文章{i}</title><link>https://example.com/{i}</link>'
+            f'<description>Use &amp;lt;div&amp;gt; for layout</description>'
+            f'<pubDate>{(now - timedelta(hours=hours)).strftime("%a, %d %b %Y %H:%M:%S")} +0800</pubDate></item>'
+            for i, hours in enumerate((1, 48))
+        )
+        body = f'<rss version="2.0"><channel>{items}</channel></rss>'.encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://etag.example.com/feed', 'keywords': []}
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.fetcher.validator_cache = ValidatorCache(os.path.join(tmp_dir, 'http_cache.json'))
+            self.fetcher.feed_cache = FeedBodyCache(os.path.join(tmp_dir, 'feed_cache.json'))
+            
+            # 解析失败：不记录验证器，下次仍发送无条件请求
+            mock_get.return_value = MagicMock(status_code=200, headers={'ETag': '"v1"'}, content=body)
+            with patch.object(self.fetcher, '_parse_with_hash_cache', side_effect=ValueError('解析失败')):
+                self.assertEqual(self.fetcher.fetch_rss_feed(source), [])
+            self.assertEqual(self.fetcher.validator_cache.request_headers(source['url']), {})
+            
+            parsed = self.fetcher.fetch_rss_feed(source)
+            self.assertEqual(len(parsed), 2)
+            self.assertEqual(parsed[0]['summary'], 'Use <div> for layout')
+            self.assertEqual(self.fetcher.validator_cache.request_headers(source['url']), {'If-None-Match': '"v1"'})
+            
+            # 304：复用的文章与解析结果一致（已规范化的摘要不再重复去 HTML）
+            mock_get.return_value = MagicMock(status_code=304, headers={})
+            articles = self.fetcher.fetch_rss_feed(source, cutoff=now - timedelta(hours=24))
+            self.assertEqual([a['title'] for a in articles], ['文章0'])
+            self.assertEqual(articles[0], parsed[0])
+            self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+    
+    def test_content_hash_reuses_parsed_entries(self):
+        """测试正文不变时跳过解析，变化时只解析新条目"""
+        import tempfile
+        import feedparser
+        
+        def build_feed(titles):
+            items = ''.join(
+                f'<item><title>{t}</title><link>https://example.com/{t}</link>'
+                f'<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item>'
+                for t in titles
+            )
+            return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>测试</title>{items}</channel></rss>'.encode('utf-8')
+        
+        source = {'name': '测试源', 'url': 'https://hash.example.com/feed', 'max_items': 10}
+        real_parse = feedparser.parse
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.fetcher.feed_cache = FeedBodyCache(os.path.join(tmp_dir, 'feed_cache.json'))
+            with patch('feed_stream.feedparser.parse', side_effect=real_parse) as mock_parse:
+                first = self.fetcher._parse_with_hash_cache(build_feed(['a', 'b']), source)
+                self.assertEqual([a['title'] for a in first], ['a', 'b'])
+                self.assertEqual(mock_parse.call_count, 1)
+                
+                again = self.fetcher._parse_with_hash_cache(build_feed(['a', 'b']), source)
+                self.assertEqual([a['title'] for a in again], ['a', 'b'])
+                self.assertEqual(mock_parse.call_count, 1)
+                
+                changed = self.fetcher._parse_with_hash_cache(build_feed(['c', 'a', 'b']), source)
+                self.assertEqual([a['title'] for a in changed], ['c', 'a', 'b'])
+                self.assertEqual(mock_parse.call_count, 2)
+                self.assertEqual(len(mock_parse.call_args[0][0].split(b'<item>')), 2)
+            
+            stats = self.fetcher.feed_cache.stats()
+            self.assertEqual(stats['body_hits'], 1)
+            self.assertEqual(stats['parsed_entries'], 3)
+    
+    MALFORMED_FEED = (
+        '<rss version="2.0"><channel><item><title>A&nbsp;B &amp; C&mdash;D</title>'
+        '<link>https://example.com/x?a=1&b=2</link>'
+        '<description>x &lt;b&gt;bold&lt;/b&gt; y</description>'
+        '<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item></channel></rss>'
+    ).encode('utf-8')
+    
+    def test_hash_cache_parses_malformed_feed_with_feedparser(self):
+        """测试非格式良好的源（HTML 实体、未转义的 &）按原始文档解析，标题、摘要与链接不被 lxml 修复损坏"""
+        import tempfile
+        
+        source = {'name': '测试源', 'url': 'https://malformed.example.com/feed'}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.fetcher.feed_cache = FeedBodyCache(os.path.join(tmp_dir, 'feed_cache.json'))
+            articles = self.fetcher._parse_with_hash_cache(self.MALFORMED_FEED, source)
+        
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(articles[0]['title'], 'A B & C—D')
+        self.assertEqual(articles[0]['link'], 'https://example.com/x?a=1&b=2')
+        self.assertEqual(articles[0]['summary'], 'x bold y')
+    
+    def test_streaming_parser_falls_back_on_malformed_feed(self):
+        """测试流式解析遇到解析器报错时改为 feedparser 整体解析原始文档"""
+        source = {'name': '测试源', 'url': 'https://malformed-stream.example.com/feed'}
+        
+        article = self.fetcher._parse_streaming(self.MALFORMED_FEED, source)[0][1]
+        
+        self.assertEqual(article['title'], 'A B & C—D')
+        self.assertEqual(article['link'], 'https://example.com/x?a=1&b=2')
+        self.assertEqual(article['summary'], 'x bold y')
+    
+    @patch('feed_stream.feedparser.parse')
+    def test_streaming_parser_stops_at_max_items(self, mock_parse):
+        """测试流式解析在取满 max_items 后停止"""
+        items = ''.join(
+            f'<item><title>文章{i}</title><link>https://example.com/{i}</link>'
+            f'<description><![CDATA[<p>正文{i}</p>]]></description>'
+            f'<pubDate>Mon, 01 Jan 2024 {i % 24:02d}:00:00 +0800</pubDate></item>'
+            for i in range(200)
+        )
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://stream.example.com/feed', 'max_items': 3}
+        
+        pairs = self.fetcher._parse_streaming(body, source)
+        
+        mock_parse.assert_not_called()
+        self.assertEqual([a['title'] for _, a in pairs], ['文章0', '文章1', '文章2'])
+        # 摘要入库前去掉 HTML
+        self.assertEqual(pairs[1][1]['summary'], '正文1')
+        # 发布时间转换为配置时区（Asia/Shanghai）下的本地时间
+        self.assertEqual(pairs[1][1]['published'], datetime(2024, 1, 1, 1, 0))
+    
+    def test_streaming_parser_atom(self):
+        """测试流式解析 Atom 源"""
+        body = '''<?xml version="1.0" encoding="utf-8"?>
+        <feed xmlns="http://www.w3.org/2005/Atom">
+            <entry>
+                <title>Atom 文章</title>
+                <link rel="alternate" href="https://example.com/atom"/>
+                <summary>摘要</summary>
+                <updated>2024-01-01T12:00:00Z</updated>
+            </entry>
+        </feed>'''.encode('utf-8')
+        
+        pairs = self.fetcher._parse_streaming(body, {'name': '测试源', 'url': 'https://atom.example.com/feed'})
+        
+        article = pairs[0][1]
+        self.assertEqual(article['title'], 'Atom 文章')
+        self.assertEqual(article['link'], 'https://example.com/atom')
+        self.assertEqual(article['summary'], '摘要')
+        self.assertEqual(article['published'], datetime(2024, 1, 1, 20, 0))
+    
+    def test_process_pool_parse_matches_in_process(self):
+        """测试进程池解析与当前进程解析结果一致"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        items = ''.join(
+            f'<item><title>文章{i}</title><link>https://example.com/{i}</link>'
+            f'<description>{"正文" * 50}</description>'
+            f'<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item>'
+            for i in range(30)
+        )
+        body = f'<rss version="2.0"><channel>{items}</channel></rss>'.encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://pool.example.com/feed', 'max_items': 30}
+        
+        expected = self.fetcher._parse_full(body, source)
+        self.fetcher.parse_pool_min_bytes = 0
+        self.fetcher._parse_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            pooled = self.fetcher._parse_full(body, source)
+        finally:
+            self.fetcher._parse_pool.shutdown()
+            self.fetcher._parse_pool = None
+        
+        self.assertEqual(pooled, expected)
+        self.assertEqual(len(pooled), 30)
+    
+    def test_fetch_skips_entries_outside_window(self):
+        """测试时间窗口在抓取阶段生效，按时间排序的源遇到窗口外条目即停止"""
+        from email.utils import format_datetime
+        from datetime import timezone
+        
+        now = datetime.now(timezone.utc)
+        items = ''.join(
+            f'<item><title>文章{h}</title><link>https://example.com/{h}</link>'
+            f'<pubDate>{format_datetime(now - timedelta(hours=h))}</pubDate></item>'
+            for h in (1, 30, 2)
+        )
+        body = f'<rss version="2.0"><channel>{items}</channel></rss>'.encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://window.example.com/feed'}
+        cutoff = self.fetcher._make_cutoff(24)
+        
+        pairs = self.fetcher._parse_full(body, source, cutoff)
+        self.assertEqual([a['title'] for _, a in pairs], ['文章1', '文章2'])
+        
+        ordered = dict(source, date_ordered=True)
+        self.assertEqual([a['title'] for _, a in self.fetcher._parse_full(body, ordered, cutoff)], ['文章1'])
+        self.assertEqual([a['title'] for _, a in self.fetcher._parse_streaming(body, ordered, cutoff=cutoff)], ['文章1'])
+    
+    def test_article_store_emits_only_new_articles(self):
+        """测试文章库只返回未见过的文章，并可查询完整时间窗口"""
+        import tempfile
+        
+        now = datetime(2024, 1, 2, 12, 0)
+        first = {'id': 'guid-1', 'title': '文章1', 'link': 'https://example.com/1', 'summary': '',
+                 'published': now - timedelta(hours=1), 'source': '源A', 'source_url': 'https://a.example.com/feed'}
+        second = {'title': '文章2', 'link': 'https://example.com/2', 'summary': '',
+                  'published': now - timedelta(hours=30), 'source': '源B', 'source_url': 'https://b.example.com/feed'}
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ArticleStore(os.path.join(tmp_dir, 'articles.db'))
+            self.assertEqual(len(store.add_new([first, second])), 2)
+            self.assertEqual(store.add_new([first, dict(second, title='标题更新')]), [])
+            
+            window = store.query(now - timedelta(hours=24))
+            self.assertEqual([a['title'] for a in window], ['文章1'])
+            self.assertEqual(len(store.query(now - timedelta(days=2), source='源B')), 1)
+            store.close()
+    
+    def test_article_store_term_statistics(self):
+        """测试文章库增量维护文档频率：新增、重复写入与清理后统计保持一致"""
+        import tempfile
+        
+        now = datetime(2024, 1, 10, 12, 0)
+        old = {'title': 'AI 芯片', 'summary': 'ai 推理', 'link': 'https://example.com/1', 'published': now - timedelta(days=40)}
+        new = {'title': 'AI 模型', 'summary': '', 'link': 'https://example.com/2', 'published': now}
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ArticleStore(os.path.join(tmp_dir, 'articles.db'))
+            store.add_new([old, new])
+            store.add_new([new])
+            self.assertEqual(store.corpus_stats(), (2, 3.0))
+            self.assertEqual(store.document_frequencies(['ai', '芯片', '不存在']), {'ai': 2, '芯片': 1})
+            
+            store.prune(now)
+            self.assertEqual(store.corpus_stats(), (1, 2.0))
+            self.assertEqual(store.document_frequencies(['ai', '芯片']), {'ai': 1})
+            store.close()
+    
+    def test_circuit_breaker_backoff(self):
+        """测试连续失败后熔断，并按指数退避重新探测"""
+        import tempfile
+        
+        now = datetime(2024, 1, 1, 9, 0)
+        dead = {'name': '失效源', 'url': 'https://dead.example.com/feed'}
+        flaky = {'name': '不稳定源', 'url': 'https://flaky.example.com/feed'}
+        healthy = {'name': '正常源', 'url': 'https://ok.example.com/feed'}
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            health_file = os.path.join(tmp_dir, 'source_health.json')
+            health = SourceHealth(health_file, failure_threshold=2, backoff_hours=24)
+            for _ in range(2):
+                health.record_failure(dead['url'], 30, now)
+            health.record_failure(flaky['url'], 5, now)
+            health.record_success(healthy['url'], 1, now)
+            health.save()
+            
+            reloaded = SourceHealth(health_file, failure_threshold=2, backoff_hours=24)
+            runnable, skipped = reloaded.partition([dead, flaky, healthy], now)
+            self.assertEqual(skipped, [dead])
+            self.assertEqual(sorted(runnable, key=reloaded.schedule_key), [healthy, flaky])
+            self.assertFalse(reloaded.is_open(dead['url'], now + timedelta(hours=25)))
+            
+            # 探测再次失败，退避时间翻倍
+            reloaded.record_failure(dead['url'], 10, now + timedelta(hours=25))
+            self.assertTrue(reloaded.is_open(dead['url'], now + timedelta(hours=70)))
+            self.assertFalse(reloaded.is_open(dead['url'], now + timedelta(hours=74)))
+            
+            reloaded.record_success(dead['url'], 2, now + timedelta(hours=74))
+            self.assertEqual(reloaded.get(dead['url'])['consecutive_failures'], 0)
+    
+    def test_url_index_dedups_across_days(self):
+        """测试规范化链接去重：跟踪参数、移动版与 AMP 变体视为同一链接，并跨运行持久化"""
+        import tempfile
+        from datetime import date
+        
+        variants = [
+            'http://www.36kr.com/p/123/?utm_source=rss&utm_medium=feed#comments',
+            'https://m.36kr.com/p/123',
+            'https://36kr.com/p/123/amp',
+            'https://www-36kr-com.cdn.ampproject.org/c/s/36kr.com/p/123'
+        ]
+        self.assertEqual({canonicalize_url(url) for url in variants}, {'https://36kr.com/p/123'})
+        self.assertEqual(canonicalize_url('https://a.com/x?b=2&a=1&fbclid=z'), 'https://a.com/x?a=1&b=2')
+        self.assertEqual(canonicalize_url('https://a.com/x?id=1&ref=feed'), 'https://a.com/x?id=1&ref=feed')
+        # 路由锚点区分不同文章，页内锚点去掉
+        self.assertNotEqual(canonicalize_url('https://a.com/#/post/1'), canonicalize_url('https://a.com/#/post/2'))
+        self.assertEqual(canonicalize_url('http://www.a.com/#!/post/1'), 'https://a.com#!/post/1')
+        
+        day1 = date(2024, 1, 1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'url_index.json')
+            index = UrlIndex(path, retention_days=7)
+            batch = [{'link': url} for url in variants[:2]] + [{'link': 'https://36kr.com/p/456'}, {'link': ''}]
+            self.assertEqual(len(index.filter_new(batch, day1)), 3)
+            index.save()
+            
+            reloaded = UrlIndex(path, retention_days=7)
+            self.assertIn(variants[3], reloaded)
+            self.assertEqual(reloaded.filter_new([{'link': variants[2]}], day1 + timedelta(days=1)), [])
+            
+            reloaded.prune(day1 + timedelta(days=8))
+            self.assertEqual(len(reloaded), 0)
+    
+    def test_source_prefilter(self):
+        """测试源级预筛选：按源的包含/排除关键词丢弃条目，并按源统计移除数量"""
+        source = {'name': '测试源', 'url': 'https://example.com/feed.xml',
+                  'keywords': ['AI', '人工智能'], 'exclude_keywords': ['广告']}
+        articles = [
+            {'title': 'AI 芯片发布', 'summary': ''},
+            {'title': 'The maid said hello', 'summary': ''},
+            {'title': '人工智能广告', 'summary': ''},
+            {'title': '新品', 'summary': '人工智能助手上线'}
+        ]
+        
+        kept = self.fetcher._prefilter(source, articles)
+        
+        self.assertEqual([a['title'] for a in kept], ['AI 芯片发布', '新品'])
+        self.assertEqual(self.fetcher.prefilter_stats['测试源'], {'checked': 4, 'removed': 2})
+        self.assertIs(self.fetcher._source_filter(source), self.fetcher._source_filter(dict(source)))
+        self.assertEqual(self.fetcher._prefilter({'name': '无规则', 'url': 'https://x.com/rss'}, articles), articles)
+    
+    def test_summary_normalized_at_ingest(self):
+        """测试摘要在解析时去掉 HTML、脚本样式和多余空白并截断，同时附带小写匹配文本"""
+        html = ('<div style="color:red"><p>OpenAI 发布&nbsp;<b>GPT-5</b></p>'
+                '<script>track()</script><img src="a.png"/>\n\n<p>Second   Para</p></div>')
+        body = ('<rss version="2.0"><channel>'
+                '<item><title>  AI\n 新闻 </title><link>https://example.com/1</link>'
+                f'<description><![CDATA[{html}]]></description>'
+                '<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item>'
+                '</channel></rss>').encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://html.example.com/feed'}
+        
+        for pairs in (self.fetcher._parse_full(body, source), self.fetcher._parse_streaming(body, source)):
+            article = pairs[0][1]
+            self.assertEqual(article['title'], 'AI 新闻')
+            self.assertEqual(article['summary'], 'OpenAI 发布 GPT-5 Second Para')
+            self.assertEqual(article['match_text'], 'ai 新闻 openai 发布 gpt-5 second para')
+        
+        self.fetcher.summary_max_chars = 10
+        article = self.fetcher._parse_full(body, source)[0][1]
+        self.assertEqual(article['summary'], 'OpenAI 发布…')
+    
+    def test_plain_text_summary_keeps_angle_brackets(self):
+        """测试纯文本摘要中的 "<" 不被当作标签截断，只含实体时直接解码"""
+        self.assertEqual(normalize_summary('if x<y then z', 0), 'if x<y then z')
+        self.assertEqual(normalize_summary('1 < 2 && 3 > 2', 0), '1 < 2 && 3 > 2')
+        self.assertEqual(normalize_summary('a &lt; b &amp; c', 0), 'a < b & c')
+        self.assertEqual(normalize_summary('<!-- ad --><p>x</p>', 0), 'x')
+    
+    def test_article_record(self):
+        """测试文章记录：只读、可按字典读取、可哈希、来源字符串驻留、派生字段缓存，解析结果均为 Article"""
+        import pickle
+        
+        published = datetime(2024, 1, 1, 8, 30)
+        source_name = ''.join(['测试', '源'])
+        article = Article.create('1', ' OpenAI\n发布 ', 'https://example.com/1', published,
+                                 '<p>GPT-5 <b>上线</b></p>', source_name, 'https://example.com/feed')
+        other = Article('2', '标题', 'https://example.com/2', published, '', '测试源', 'https://example.com/feed')
+        
+        self.assertEqual(article['title'], 'OpenAI 发布')
+        self.assertEqual(article.get('summary'), 'GPT-5 上线')
+        self.assertEqual(article.get('missing', ''), '')
+        self.assertEqual(article['match_text'], 'openai 发布 gpt-5 上线')
+        self.assertEqual(dict(article)['source'], '测试源')
+        self.assertIs(article.source, other.source)
+        # 发布时间按配置时区解释：Asia/Shanghai 的 08:30 即 UTC 00:30
+        self.addCleanup(article_module.set_timezone, self.fetcher.timezone)
+        article_module.set_timezone(ZoneInfo('Asia/Shanghai'))
+        self.assertEqual(article.timestamp, int(datetime(2024, 1, 1, 0, 30, tzinfo=timezone.utc).timestamp()))
+        with self.assertRaises(AttributeError):
+            article.title = '修改'
+        with self.assertRaises(TypeError):
+            article['title'] = '修改'
+        copy = Article(*(article[field] for field in ('id', 'title', 'link', 'published', 'summary', 'source', 'source_url')))
+        self.assertEqual(copy, article)
+        self.assertEqual(len({article, copy, other}), 2)
+        self.assertEqual(pickle.loads(pickle.dumps(article)), article)
+        
+        body = ('<rss version="2.0"><channel><item><title>文章</title><link>https://example.com/a</link>'
+                '<description>正文</description></item></channel></rss>').encode('utf-8')
+        source = {'name': '测试源', 'url': 'https://article.example.com/feed'}
+        for pairs in (self.fetcher._parse_full(body, source), self.fetcher._parse_streaming(body, source)):
+            self.assertIsInstance(pairs[0][1], Article)
+    
     def test_filter_recent_articles(self):
         """测试最近文章筛选"""
-        # 创建测试文章
-        now = datetime.now()
+        # 创建测试文章（与抓取阶段使用同一时区基准）
+        now = self.fetcher.now()
         old_article = {
             'title': '旧文章',
-            'published': now.replace(hour=now.hour - 25)  # 25小时前
+            'published': now - timedelta(hours=25)  # 25小时前
         }
         new_article = {
             'title': '新文章',
-            'published': now.replace(hour=now.hour - 12)  # 12小时前
+            'published': now - timedelta(hours=12)  # 12小时前
         }
         
         articles = [old_article, new_article]